@@ -1,15 +1,25 @@
 #%%
 #type: ignore
 
-import yfinance as yf
 import streamlit as st
 import plotly.graph_objs as go
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import plotly.express as px
-from datetime import datetime, timedelta 
-from scipy.optimize import minimize
+from returns_panel import ReturnsPanel
+from metadata_cache import get_ticker_metadata
+from ticker_validation import is_valid_ticker
+from risk_free import latest_risk_free_rate
+from fetch_planner import FetchPlan
+from beta_engine import batch_beta, rank_by_beta, rolling_beta_surface
+from moving_average import MovingAverageCache
+from capm import capm_expected_returns, security_market_line_chart
+from risk_metrics import risk_metrics, historical_var_es, rolling_var_es
+from monte_carlo_var import monte_carlo_var_es
+from bootstrap import bootstrap_confidence_intervals
+from portfolio_optimiser import SharpeProblem
+from covariance import SingleIndexCovariance, ledoit_wolf_cov, constant_correlation_cov
 
 st.set_page_config(page_title="MIS20080 - Project", layout="wide")
 st.title("Stock Analysis & Portfolio Optimisation Dashboard")
@@ -25,29 +35,35 @@ if ticker == "":
     st.stop()
 add_to_portfolio = st.checkbox("Add this stock to portfolio", value=False)
 
+# Fetch every data dependency of this rerun at once rather than one after another
+# (the competitor box is further down the page so read its value from session state here)
+competitor = st.session_state.get("competitor_ticker", "NVDA").upper()
+plan = FetchPlan()
 if add_to_portfolio:
-    try:
-        data = yf.download(ticker, period="1d", progress=False)
-        if data.empty:
-            st.warning(f"Ticker {ticker} not found — not added.")
-        elif ticker not in st.session_state.portfolio_tickers:
-            st.session_state.portfolio_tickers.append(ticker)
-            st.session_state.portfolio_tickers = sorted(set(st.session_state.portfolio_tickers))
-            st.success(f"{ticker} added to portfolio.")
-        else:
-            st.info(f"{ticker} is already in your portfolio.")
-    except Exception:
+    plan.add("valid", is_valid_ticker, ticker)
+plan.add("metadata", get_ticker_metadata, ticker)
+plan.add("panel", ReturnsPanel.from_store,
+         [ticker, competitor, "^GSPC"] + st.session_state.portfolio_tickers, period="5y")
+plan.add("rf", latest_risk_free_rate)  # warms the cache read by get_10y_gov_bond_yield()
+fetched = plan.run()
+
+if add_to_portfolio:
+    # checked against the local symbol index, only never-seen symbols hit the network
+    if not fetched["valid"]:
         st.warning(f"Ticker {ticker} not found — not added.")
+    elif ticker not in st.session_state.portfolio_tickers:
+        st.session_state.portfolio_tickers.append(ticker)
+        st.session_state.portfolio_tickers = sorted(set(st.session_state.portfolio_tickers))
+        st.success(f"{ticker} added to portfolio.")
+    else:
+        st.info(f"{ticker} is already in your portfolio.")
 
 portfolio_tickers = st.session_state.portfolio_tickers
 
 
 # displaying company name in streamlit app and getting latest news link
-tkr_obj = yf.Ticker(ticker)
-try:
-    ticker_info = tkr_obj.info or {}
-except Exception:
-    ticker_info = {}  # handle case where no info available
+# (name and industry come from one cached .info lookup instead of two scrapes per rerun)
+ticker_info = fetched["metadata"] or {}  # handle case where no info available
 
 company_name = ticker_info.get("longName") or ticker_info.get("shortName") or ticker
 
@@ -59,13 +75,11 @@ else:
 # Industry info
 def get_ticker_industry(ticker):
     """Safely get industry info; return 'Unknown' if ticker invalid."""
-    try:
-        ticker_info = yf.Ticker(ticker).info
-        industry = ticker_info.get("industry", "Industry not found")
-        return industry
-    except Exception as e:
+    ticker_info = get_ticker_metadata(ticker)
+    if ticker_info is None:
         st.error(f"Could not retrieve info for ticker '{ticker}'. Please check the symbol.")
         return "Unknown"
+    return ticker_info.get("industry", "Industry not found")
 
 industry = get_ticker_industry(ticker)
 if industry == "Unknown":
@@ -80,17 +94,15 @@ st.caption(f"For the latest news from the Financial Times on {company_name}")
 st.markdown(f"[Click here]({ft_search})")
 st.caption("(Note that no new articles may be available for the chosen stock)")
 
-# Download data
-SPX_data = yf.download(["^GSPC"], period="5y", auto_adjust=False, progress=False)
-ticker_data = yf.download([ticker], period="5y", auto_adjust=False, progress=False)
-
-if ticker_data is None or ticker_data.empty:
+# Data for every section (ticker, competitor, benchmark and portfolio) was loaded once above
+panel = fetched["panel"]
+if panel is None or ticker not in panel:
     st.error(f"Ticker {ticker} not found.")
     st.stop()
 
-# Daily returns (ensure 1-D Series)
-SPX_returns   = SPX_data["Adj Close"].pct_change().dropna().squeeze()
-ticker_returns = ticker_data["Adj Close"].pct_change().dropna().squeeze()
+# Daily returns (1-D Series)
+SPX_returns   = panel.returns("^GSPC")
+ticker_returns = panel.returns(ticker)
 
 # Cumulative returns
 cumulative_SPX_returns    = (1 + SPX_returns).cumprod() - 1
@@ -125,43 +137,47 @@ fig.update_layout(
 st.plotly_chart(fig, use_container_width=True)
 
 # 5-year Beta (align dates using a joined frame)
-ret = pd.concat(
-    [ticker_returns.rename("Ri"), SPX_returns.rename("Rm")],
-    axis=1
-).dropna()
-Ri = ret["Ri"].values
-Rm = ret["Rm"].values
-N = len(ret)
-
-Ri_mean = Ri.mean()
-Rm_mean = Rm.mean()
-
-Rm_var = Rm.var(ddof=1)
-Covar = ((Ri - Ri_mean) * (Rm - Rm_mean)).sum() / (N - 1)
-Beta = Covar / Rm_var
+ret = panel.aligned([ticker, "^GSPC"])
+ret.columns = ["Ri", "Rm"]
+Beta = float(batch_beta(ret[["Ri"]], ret["Rm"])["Beta"].iloc[0])  # Cov(Ri, Rm) / Var(Rm)
 st.write(f"The 5-year Beta for {ticker} is {Beta:.3f}")
 
-# Rolling Beta (60-day window)
+# Rolling Beta - every window is computed at once from shared prefix sums and cached,
+# so switching or overlaying windows doesn't recompute anything
+beta_windows = [20, 60, 120, 250]
+beta_colors = {20: "green", 60: "orange", 120: "purple", 250: "red"}
+
+@st.cache_data
+def get_rolling_beta_surface(ticker, Ri, Rm):
+    """Date x window table of rolling betas for all of beta_windows."""
+    return rolling_beta_surface(Ri, Rm, beta_windows)
+
+beta_surface = get_rolling_beta_surface(ticker, ret["Ri"], ret["Rm"])
 window = 60
-rolling_cov  = ret["Ri"].rolling(window).cov(ret["Rm"])
-rolling_var  = ret["Rm"].rolling(window).var()
-rolling_beta = (rolling_cov / rolling_var).dropna()
+rolling_beta = beta_surface[window].dropna()
+
+selected_windows = st.multiselect("Rolling Beta Window (days)", beta_windows, default=[window])
+if not selected_windows:
+    selected_windows = [window]
+window_label = ", ".join(str(w) for w in selected_windows)
 
 fig_beta = go.Figure()
-fig_beta.add_trace(go.Scatter(
-    x=rolling_beta.index,   # <-- use rolling_beta's index
-    y=rolling_beta,
-    mode="lines",
-    name=f"{ticker} Rolling Beta ({window}-day window)",
-    line=dict(color="orange")
-))
+for w in selected_windows:
+    beta_series = beta_surface[w].dropna()
+    fig_beta.add_trace(go.Scatter(
+        x=beta_series.index,
+        y=beta_series,
+        mode="lines",
+        name=f"{ticker} Rolling Beta ({w}-day window)",
+        line=dict(color=beta_colors[w])
+    ))
 fig_beta.add_hline(
     y=1.0, line_dash="dot",
     annotation_text="β = 1 (market)",
     annotation_position="top left"
 )
 fig_beta.update_layout(
-    title=f"{ticker} Rolling Beta vs S&P 500 ({window}-day window)",
+    title=f"{ticker} Rolling Beta vs S&P 500 ({window_label}-day window)",
     xaxis_title="Date",
     yaxis_title="Beta (unitless)",
     template="plotly_white",
@@ -175,31 +191,24 @@ st.plotly_chart(fig_beta, use_container_width=True)
 
 st.subheader("Competitor Comparison & Risk Metrics")
 
-competitor = st.text_input("Enter Competitor's Stock Ticker", "NVDA").upper()
+competitor = st.text_input("Enter Competitor's Stock Ticker", "NVDA", key="competitor_ticker").upper()
 if competitor == "":
     st.error("Please enter a valid competitor ticker symbol.")
     st.stop()
+if competitor not in panel:
+    st.error(f"Ticker {competitor} not found.")
+    st.stop()
 
-# example
-ticker_data = yf.download([ticker], period="5y", auto_adjust=False, progress=False)
-competitor_data = yf.download([competitor], period="5y", auto_adjust=False, progress=False)
-
-ticker_returns = ticker_data["Adj Close"].pct_change().dropna().squeeze()
-competitor_returns = competitor_data["Adj Close"].pct_change().dropna().squeeze()
-
-mean_ticker_returns = ticker_returns.mean()
-mean_comp_returns = competitor_returns.mean()
+# returns come from the shared panel - no second download of the ticker
+competitor_returns = panel.returns(competitor)
 
-ticker_std_daily = float(np.std(ticker_returns.values, ddof=1))
-comp_std_daily = float(np.std(competitor_returns.values, ddof=1))
-ticker_annual_std = ticker_std_daily * np.sqrt(252)
-comp_annual_std = comp_std_daily * np.sqrt(252)
+# mean, volatility and VaR for both tickers in one vectorised call
+comp_metrics = risk_metrics(pd.concat([ticker_returns, competitor_returns], axis=1),
+                            confidence_levels=(0.95,), horizons=(252,))
 
-z_score = 1.645
-ticker_vatr_daily = (z_score*ticker_std_daily) - mean_ticker_returns
-ticker_vatr_annual = ticker_vatr_daily*np.sqrt(252)*100
-comp_vatr_daily = (z_score*comp_std_daily) - mean_comp_returns
-comp_vatr_annual = comp_vatr_daily*np.sqrt(252)*100
+mean_ticker_returns, mean_comp_returns = comp_metrics["Mean Daily Return"]
+ticker_annual_std, comp_annual_std = comp_metrics["Annual Std Dev"]
+ticker_vatr_annual, comp_vatr_annual = comp_metrics["VaR 95% 252d"] * 100
 
 #Displaying in columns
 col1, col2, col3 = st.columns(3)
@@ -213,19 +222,47 @@ col2.metric(label=f"{competitor} Annual Std Dev", value=f"{comp_annual_std:.2%}"
 col3.metric(label=f"{ticker} Annual VaR", value=f"{ticker_vatr_annual:.2f}%")
 col3.metric(label=f"{competitor} Annual VaR", value=f"{comp_vatr_annual:.2f}%")
 
+# historical tail risk (daily, 95%) - VaR and Expected Shortfall from the actual worst days
+comp_returns_df = pd.concat([ticker_returns.rename(ticker), competitor_returns.rename(competitor)], axis=1)
+comp_tail = historical_var_es(comp_returns_df, confidence_levels=(0.95,))
+col4, col5 = st.columns(2)
+col4.metric(label=f"{ticker} Historical Daily VaR (95%)", value=f"{comp_tail['Historical VaR 95%'].iloc[0]:.2%}")
+col4.metric(label=f"{competitor} Historical Daily VaR (95%)", value=f"{comp_tail['Historical VaR 95%'].iloc[1]:.2%}")
+col5.metric(label=f"{ticker} Expected Shortfall (95%)", value=f"{comp_tail['Expected Shortfall 95%'].iloc[0]:.2%}")
+col5.metric(label=f"{competitor} Expected Shortfall (95%)", value=f"{comp_tail['Expected Shortfall 95%'].iloc[1]:.2%}")
+
+# rolling 250-day Expected Shortfall for both
+rolling_var, rolling_es = rolling_var_es(comp_returns_df, window=250, confidence=0.95)
+fig_es = go.Figure()
+for name, color in [(ticker, "orange"), (competitor, "blue")]:
+    es_series = rolling_es.iloc[:, list(comp_returns_df.columns).index(name)].dropna()
+    fig_es.add_trace(go.Scatter(
+        x=es_series.index, y=es_series, mode="lines",
+        name=f"{name} Expected Shortfall (250-day)", line=dict(color=color)
+    ))
+fig_es.update_layout(
+    title="Rolling 250-day Expected Shortfall (95%, daily loss)",
+    xaxis_title="Date",
+    yaxis_title="Expected Shortfall",
+    yaxis=dict(tickformat=".1%"),
+    template="plotly_white",
+    hovermode="x unified",
+    height=300,
+)
+st.plotly_chart(fig_es, use_container_width=True)
+
 #Zach's part
 st.subheader("Daily Returns & CAPM Analysis for " + ticker)
 
-# ensure ticker_returns and SPX_returns are 1-D Series
-if isinstance(ticker_returns, pd.DataFrame):
-    ticker_returns = ticker_returns.iloc[:, 0].squeeze()
-else:
-    ticker_returns = ticker_returns.squeeze()
+# cache_resource keeps the same object between reruns (no pickling), and the leading underscore
+# stops Streamlit hashing the whole frame - the ticker plus a cheap fingerprint is the key
+@st.cache_resource(max_entries=32)
+def get_moving_average_cache(ticker, last_date, n_rows, _daily_returns_df):
+    """Moving-average lookups for the ticker and S&P 500 daily returns (aligned by date)."""
+    return MovingAverageCache(_daily_returns_df)
 
-if isinstance(SPX_returns, pd.DataFrame):
-    SPX_returns = SPX_returns.iloc[:, 0].squeeze()
-else:
-    SPX_returns = SPX_returns.squeeze()
+daily_returns_df = panel.aligned([ticker, "^GSPC"])
+daily_returns_df.columns = [ticker, "S&P500"]
 
 # interactive sliders and moving average plots (only when data exists)
 if ticker_returns.empty or SPX_returns.empty:
@@ -236,19 +273,13 @@ else:
     show_days = st.slider("Show Last N Days", min_value=1, max_value=max_days, value=max_days)
     ma_window = st.slider("Moving Average Length (Days)", min_value=0, max_value=60, value=30)
 
-    # take tail of each series and align by date
-    pf_display = ticker_returns.tail(show_days)
-    bm_display = SPX_returns.tail(show_days)
-    df_plot = pd.concat([pf_display.rename(ticker), bm_display.rename("S&P500")], axis=1).dropna()
+    # prefix sums are built once per dataset, so each slider move is just slicing
+    df_plot = get_moving_average_cache(ticker, daily_returns_df.index[-1], len(daily_returns_df),
+                                       daily_returns_df).view(show_days, ma_window)
     
     # add caption about data period used
     st.caption("Data period: 5 years (Adjusted Close)")
 
-    # add moving averages if requested
-    if ma_window > 0:
-        df_plot[f"{ticker}_MA"] = df_plot[ticker].rolling(window=ma_window).mean()
-        df_plot["S&P500_MA"] = df_plot["S&P500"].rolling(window=ma_window).mean()
-
     # portfolio vs benchmark chart using plotly (always plot main series; MAs optional)
     if ma_window > 0:
         fig = go.Figure()
@@ -294,16 +325,8 @@ st.caption("CAPM Formula: E(Ri) = Rf + βi (E(Rm) - Rf)")
 
 def get_10y_gov_bond_yield():
     """Return US 10y Treasury Yield as decimal or None on failure."""
-    try:
-        df_yield = yf.download("^TNX", period="5d", interval="1d", progress=False, auto_adjust=False)
-        if df_yield is None or df_yield.empty:
-            return None
-        val = float(df_yield["Adj Close"].iloc[-1])
-        # convert percentage to decimal
-        rf_decimal = val / 100.0 if val > 1 else val
-        return rf_decimal
-    except Exception:
-        return None
+    # served from the locally cached ^TNX history, only refreshed once the TTL expires
+    return latest_risk_free_rate()
 
 # call the function 
 live_rf = get_10y_gov_bond_yield()
@@ -319,9 +342,14 @@ else: # in the event of failure
                          value=0.02, step=0.001, format="%.4f")
 
 # align asset and market returns on overlapping dates
-combined = pd.concat([ticker_returns, SPX_returns], axis=1).dropna()
+combined = panel.aligned([ticker, "^GSPC"])
 combined.columns = [ticker, "S&P500"]
 
+@st.cache_data
+def get_bootstrap_intervals(ticker, asset_returns, market_returns, rf):
+    """Bootstrap CIs for Beta, Sharpe and CAPM return - cached as they only change with the data or rf."""
+    return bootstrap_confidence_intervals(asset_returns, market_returns, rf, n_resamples=10_000, seed=42)
+
 #wrap in if statement to avoid errors if no overlapping data
 if combined.empty:
     st.warning("Not enough overlapping returns to compute CAPM. Check data/period.")
@@ -332,17 +360,8 @@ else:
     # market annual arithmetic return
     market_annual_arith = market.mean() * Trading_days
 
-    # CAPM expected returns using Beta computed earlier
-    capm_er_annual = rf + Beta * (market_annual_arith - rf)
-
-    # convert rf to daily/quarter for CAPM on those scales
-    rf_daily = (1 + rf) ** (1 / Trading_days) - 1
-    rf_quarterly = (1 + rf) ** (1 / 4) - 1
-    market_daily_arith = market.mean()
-    market_quarterly_arith = market.mean() * (Trading_days // 4)
-
-    capm_er_daily = rf_daily + Beta * (market_daily_arith - rf_daily)
-    capm_er_quarterly = rf_quarterly + Beta * (market_quarterly_arith - rf_quarterly)
+    # CAPM expected returns using Beta computed earlier (rf converted to daily/quarterly for those scales)
+    capm_er_daily, capm_er_quarterly, capm_er_annual = capm_expected_returns([Beta], market, [rf], Trading_days)[0, 0]
 
     # display neatly
     cols = st.columns(5)
@@ -352,6 +371,11 @@ else:
     cols[3].metric("CAPM Quarterly Return", f"{capm_er_quarterly:.2%}")
     cols[4].metric("CAPM Daily Return", f"{capm_er_daily:.4%}")
 
+    # 95% block-bootstrap confidence intervals (10,000 resamples) around the point estimates
+    capm_ci = get_bootstrap_intervals(ticker, asset, market, rf)
+    st.caption("95% confidence intervals (block bootstrap, 10,000 resamples)")
+    st.dataframe(capm_ci.style.format({"Estimate": "{:.4f}", "Lower": "{:.4f}", "Upper": "{:.4f}"}))
+
     # realized returns (annualized)
     asset_clean = asset.dropna()
     realized_arith_pf = float(asset_clean.mean() * Trading_days) if len(asset_clean) > 0 else float("nan")
@@ -398,28 +422,55 @@ if len(portfolio_tickers) <2:
     st.warning("Portfolio is empty. Add at least one ticker using the checkbox above.")
     st.stop()
     
-end_date = datetime.today()
-start_date = end_date - timedelta(days = 5*365)
-print(start_date)
-
-
-
-adj_close_df = pd.DataFrame()
-
-for ticker in portfolio_tickers:
-    data = yf.download(ticker, start=start_date, end=end_date)
-    print(f"{ticker} columns:", data.columns)
-    if 'Adj Close' in data.columns:
-        adj_close_df[ticker] = data['Adj Close']
-    else:
-        adj_close_df[ticker] = data['Close']
+# holdings were loaded into the shared panel at the top of the page (same 5 year window)
+adj_close_df = panel.prices[[t for t in portfolio_tickers if t in panel]]
 print(adj_close_df) 
 
-log_returns = np.log(adj_close_df/ adj_close_df.shift(1))
-
-log_returns = log_returns.dropna()
+# holdings whose prices failed to load are left out of everything below
+dropped_tickers = [t for t in portfolio_tickers if t not in panel]
+if dropped_tickers:
+    st.warning(f"No price data for {', '.join(dropped_tickers)} - left out of the portfolio.")
+if len(adj_close_df.columns) < 2:
+    st.warning("Fewer than two holdings have price data. Add more tickers using the checkbox above.")
+    st.stop()
 
-cov_matrix = log_returns.cov()*252
+log_returns = panel.log_returns(list(adj_close_df.columns))
+
+# betas of every holding against the S&P 500 in one matrix operation
+holdings_returns = panel.aligned(list(adj_close_df.columns) + ["^GSPC"])
+holdings_betas = rank_by_beta(holdings_returns[list(adj_close_df.columns)], holdings_returns["^GSPC"])
+st.subheader("Portfolio Holdings Beta vs S&P 500")
+st.dataframe(holdings_betas[["Beta", "Alpha", "R2"]].style.format({
+    "Beta": "{:.3f}",
+    "Alpha": "{:.4%}",
+    "R2": "{:.2f}"
+}))
+
+# CAPM for every holding over a grid of risk-free rates in one calculation
+rf_shift = st.slider("Risk-free rate sensitivity (±)", min_value=0.0, max_value=0.05, value=0.01, step=0.005, format="%.3f")
+rf_grid = sorted({max(rf - rf_shift, 0.0), rf, rf + rf_shift})
+holdings_capm = capm_expected_returns(holdings_betas["Beta"], holdings_returns["^GSPC"], rf_grid, Trading_days)
+holdings_realised = holdings_returns[list(holdings_betas.index)].mean() * Trading_days
+
+st.plotly_chart(security_market_line_chart(holdings_betas.index, holdings_betas["Beta"], holdings_realised,
+                                           holdings_returns["^GSPC"], rf_grid, Trading_days),
+                use_container_width=True)
+capm_table = pd.DataFrame(holdings_capm[:, :, 2], index=holdings_betas.index,
+                          columns=[f"CAPM Annual (Rf = {r:.2%})" for r in rf_grid])
+st.dataframe(capm_table.style.format("{:.2%}"))
+
+# sample covariance, a shrinkage estimate, or the single-index model built from the holdings' betas against the S&P 500
+cov_model = st.radio("Covariance model", ["Sample", "Ledoit-Wolf", "Constant correlation", "Single-index (S&P 500)"],
+                     index=0, horizontal=True)
+if cov_model == "Sample":
+    cov_matrix = log_returns.cov()*252
+elif cov_model in ("Ledoit-Wolf", "Constant correlation"):
+    shrinkage_estimator = ledoit_wolf_cov if cov_model == "Ledoit-Wolf" else constant_correlation_cov
+    cov_matrix = shrinkage_estimator(log_returns)*252
+    st.caption(f"Shrinkage intensity: {cov_matrix.attrs['shrinkage']:.2f}")
+else:
+    factor_returns = panel.log_returns(list(adj_close_df.columns) + ["^GSPC"])
+    cov_matrix = SingleIndexCovariance.from_returns(factor_returns[list(adj_close_df.columns)], factor_returns["^GSPC"])
 print(cov_matrix)
 
 def standard_deviation(weights, cov_matrix):
@@ -434,20 +485,15 @@ def sharpe_ratio(weights, log_returns, cov_matrix, risk_free_rate):
 
 risk_free_rate = rf
 
-def neg_sharpe_ratio(weights, log_returns, cov_matrix, risk_free_rate):
-    return -sharpe_ratio(weights, log_returns, cov_matrix, risk_free_rate)
-
-constraints = {'type':'eq','fun': lambda weights: np.sum(weights) - 1}
-bounds = [(0, 1) for _ in range(len(portfolio_tickers))]
+bounds = [(0, 1) for _ in range(len(log_returns.columns))]
 
-initial_weights = np.array([1/len(portfolio_tickers)]*len(portfolio_tickers))
-print(initial_weights)
-
-optimized_results = minimize(neg_sharpe_ratio, initial_weights, args=(log_returns, cov_matrix, risk_free_rate), method='SLSQP', constraints=constraints, bounds=bounds)
+# mean vector and covariance are compiled once; the solver gets exact gradients instead of finite differences
+optimiser = SharpeProblem(log_returns, cov_matrix, risk_free_rate)
+optimized_results = optimiser.solve(bounds=bounds)
 optimal_weights = optimized_results.x
 
 print('optimal_weights:')
-for ticker, weight in zip(portfolio_tickers, optimal_weights):
+for ticker, weight in zip(log_returns.columns, optimal_weights):
     print(f"{ticker}:{weight:.4f}")
 
 print()
@@ -460,9 +506,24 @@ st.write(f"Expected Annual Return of Optimized Portfolio: {optimal_portfolio_ret
 st.write(f"Expected Volatility of Optimized Portfolio: {optimal_portfolio_volatility:.2%}")
 st.write(f"Optimal Sharpe Ratio: {optimal_sharpe_ratio:.2f}")
 
+# uncertainty around the optimal Sharpe ratio from resampling the portfolio's daily log returns
+portfolio_log_returns = panel.log_returns(list(adj_close_df.columns) + ["^GSPC"])
+portfolio_ci = get_bootstrap_intervals("portfolio", portfolio_log_returns[list(adj_close_df.columns)] @ optimal_weights,
+                                       portfolio_log_returns["^GSPC"], risk_free_rate)
+sharpe_low, sharpe_high = portfolio_ci.loc["Sharpe Ratio", ["Lower", "Upper"]]
+st.write(f"95% Confidence Interval for Sharpe Ratio: {sharpe_low:.2f} to {sharpe_high:.2f}")
+
+# Monte Carlo VaR / Expected Shortfall of the optimised portfolio (correlated scenarios from the covariance)
+mc_horizon = st.selectbox("Monte Carlo VaR horizon (trading days)", [1, 5, 21], index=0)
+mc_results = monte_carlo_var_es(optimal_weights, log_returns.mean(), log_returns.cov(),
+                                n_paths=100_000, horizon_days=mc_horizon, seed=42)
+mc_cols = st.columns(4)
+for col, (label, value) in zip(mc_cols, mc_results.items()):
+    col.metric(f"Monte Carlo {label} ({mc_horizon}d)", f"{value:.2%}")
+
 fig = go.Figure(data=[
     go.Bar(
-        x=portfolio_tickers,
+        x=list(log_returns.columns),
         y=optimal_weights,
         text=[f"{w:.4f}" for w in optimal_weights],
         textposition="outside"
@@ -476,5 +537,25 @@ fig.update_layout(
     template="plotly_white"
 )
 
-st.plotly_chart(fig, use_container_width=True)
+# efficient frontier from warm-started minimum-variance solves, with the optimal portfolio marked
+frontier, frontier_weights = optimiser.efficient_frontier(n_points=100, bounds=bounds)
+frontier_fig = go.Figure([
+    go.Scatter(x=frontier["Volatility"], y=frontier["Return"], mode="lines", name="Efficient Frontier"),
+    go.Scatter(x=log_returns.std()*np.sqrt(252), y=log_returns.mean()*252, mode="markers+text",
+               text=list(log_returns.columns), textposition="top center", name="Holdings"),
+    go.Scatter(x=[optimal_portfolio_volatility], y=[optimal_portfolio_returns], mode="markers",
+               marker=dict(symbol="star", size=14), name="Max Sharpe")
+])
+frontier_fig.update_layout(
+    title="Efficient Frontier",
+    xaxis_title="Annual Volatility",
+    yaxis_title="Expected Annual Return",
+    xaxis_tickformat=".0%",
+    yaxis_tickformat=".0%",
+    template="plotly_white"
+)
+
+weights_col, frontier_col = st.columns(2)
+weights_col.plotly_chart(fig, use_container_width=True)
+frontier_col.plotly_chart(frontier_fig, use_container_width=True)
 # %%
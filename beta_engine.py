@@ -0,0 +1,151 @@
+"""Vectorised beta calculations against the S&P 500 for a whole universe of tickers at once"""
+import numpy as np
+import pandas as pd
+
+
+def _as_matrix(returns):
+    """T x N float array plus column names from a DataFrame, Series or array."""
+    if isinstance(returns, pd.Series):
+        returns = returns.to_frame()
+    if isinstance(returns, pd.DataFrame):
+        return returns.to_numpy(dtype=float), list(returns.columns)
+    matrix = np.asarray(returns, dtype=float)
+    if matrix.ndim == 1:
+        matrix = matrix[:, None]
+    return matrix, list(range(matrix.shape[1]))
+
+
+def batch_beta(returns, market):
+    """Beta, alpha and R² of every column of a T x N returns matrix against the market return vector.
+
+    Same sample (ddof=1) estimates as Cov(Ri, Rm) / Var(Rm) in the dashboard, computed for all
+    N tickers in one pass. NaNs (e.g. before a stock listed) are left out column by column.
+    Returns a DataFrame indexed by ticker with columns Beta, Alpha and R2 (alpha is per day).
+    """
+    R, names = _as_matrix(returns)
+    m = np.asarray(market, dtype=float).reshape(-1)
+    if len(m) != R.shape[0]:
+        raise ValueError("returns and market must have the same number of dates")
+
+    mask = ~np.isnan(R) & ~np.isnan(m)[:, None]
+    n = mask.sum(axis=0)
+    M = np.where(mask, m[:, None], 0.0)
+    R0 = np.where(mask, R, 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_r = R0.sum(axis=0) / n
+        mean_m = M.sum(axis=0) / n
+        # centre before multiplying so small daily returns don't lose precision
+        Rc = np.where(mask, R0 - mean_r, 0.0)
+        Mc = np.where(mask, M - mean_m, 0.0)
+        cov = (Rc * Mc).sum(axis=0) / (n - 1)
+        var_m = (Mc * Mc).sum(axis=0) / (n - 1)
+        var_r = (Rc * Rc).sum(axis=0) / (n - 1)
+
+        beta = cov / var_m
+        alpha = mean_r - beta * mean_m
+        r_squared = cov ** 2 / (var_m * var_r)
+
+    return pd.DataFrame({"Beta": beta, "Alpha": alpha, "R2": r_squared, "Observations": n}, index=names)
+
+
+def rank_by_beta(returns, market, ascending=False):
+    """batch_beta() sorted by beta, highest first by default."""
+    return batch_beta(returns, market).sort_values("Beta", ascending=ascending)
+
+
+def _window_sums(csum, window):
+    """Sum of every trailing window of rows from a cumulative sum (row i covers i-window+1..i)."""
+    sums = np.full(csum.shape, np.nan)
+    if window <= len(csum):
+        sums[window - 1] = csum[window - 1]
+        sums[window:] = csum[window:] - csum[:-window]
+    return sums
+
+
+def _prefix_sums(R, m):
+    """Cumulative sums shared by every window size: r, m, r·m, m² and the count of missing values."""
+    missing = np.isnan(R) | np.isnan(m)[:, None]
+    # centre on the full-sample means first - keeps the running sums small so
+    # sum(xy) - sum(x)sum(y)/w doesn't cancel catastrophically
+    Rc = np.where(missing, 0.0, R - np.nanmean(R, axis=0))
+    mc = np.where(np.isnan(m), 0.0, m - np.nanmean(m))
+    Mc = np.where(missing, 0.0, mc[:, None])
+    return {
+        "r": np.cumsum(Rc, axis=0),
+        "m": np.cumsum(Mc, axis=0),
+        "rm": np.cumsum(Rc * Mc, axis=0),
+        "mm": np.cumsum(Mc * Mc, axis=0),
+        "gaps": np.cumsum(missing, axis=0),
+    }
+
+
+def _betas_from_prefix(prefix, window):
+    sum_r = _window_sums(prefix["r"], window)
+    sum_m = _window_sums(prefix["m"], window)
+    sum_rm = _window_sums(prefix["rm"], window)
+    sum_mm = _window_sums(prefix["mm"], window)
+    gaps = _window_sums(prefix["gaps"], window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sum_rm - sum_r * sum_m / window
+        var = sum_mm - sum_m * sum_m / window
+        return np.where(gaps > 0, np.nan, cov / var)
+
+
+def _check_lengths(R, m):
+    if len(m) != R.shape[0]:
+        raise ValueError("returns and market must have the same number of dates")
+
+
+def rolling_beta(returns, market, window=60):
+    """Rolling beta of every column against the market in one O(T·N) pass using running sums.
+
+    Matches returns[col].rolling(window).cov(market) / market.rolling(window).var(): windows
+    with any missing value give NaN. Returns a T x N DataFrame (or array if given an array).
+    """
+    R, names = _as_matrix(returns)
+    m = np.asarray(market, dtype=float).reshape(-1)
+    _check_lengths(R, m)
+    betas = _betas_from_prefix(_prefix_sums(R, m), window)
+    if isinstance(returns, (pd.DataFrame, pd.Series)):
+        return pd.DataFrame(betas, index=returns.index, columns=names)
+    return betas
+
+
+def rolling_beta_surface(returns, market, windows=(20, 60, 120, 250)):
+    """Rolling beta of one ticker for several window lengths, sharing one set of prefix sums.
+
+    Returns a date x window DataFrame (one column per window) so any window, or several
+    overlaid, can be shown without recomputing anything.
+    """
+    R, _ = _as_matrix(returns)
+    m = np.asarray(market, dtype=float).reshape(-1)
+    _check_lengths(R, m)
+    prefix = _prefix_sums(R[:, :1], m)
+    surface = np.column_stack([_betas_from_prefix(prefix, window)[:, 0] for window in windows])
+    index = returns.index if isinstance(returns, (pd.DataFrame, pd.Series)) else None
+    return pd.DataFrame(surface, index=index, columns=pd.Index(list(windows), name="Window"))
+
+
+if __name__ == "__main__":
+    # numerical check of rolling_beta() against pandas rolling cov/var: python beta_engine.py
+    rng = np.random.default_rng(42)
+    dates = pd.bdate_range("2000-01-03", periods=5000)
+    market = pd.Series(rng.normal(0.0004, 0.012, len(dates)), index=dates)
+    returns = pd.DataFrame({f"T{i}": rng.uniform(0.2, 2.0) * market + rng.normal(0.0, 0.015, len(dates))
+                            for i in range(20)}, index=dates)
+    returns.iloc[100:130, 3] = np.nan  # a gap, e.g. a suspended stock
+    # a large common offset is the worst case for running sums
+    returns["OFFSET"] = returns["T0"] + 1000.0
+
+    for window in (20, 60, 250):
+        fast = rolling_beta(returns, market, window)
+        for col in returns.columns:
+            expected = returns[col].rolling(window).cov(market) / market.rolling(window).var()
+            assert fast[col].isna().equals(expected.isna()), (window, col)
+            diff = (fast[col] - expected).abs().max()
+            assert diff < 1e-8, (window, col, diff)
+    surface = rolling_beta_surface(returns["T1"], market, (20, 60, 250))
+    for window in surface.columns:
+        assert np.allclose(surface[window], rolling_beta(returns[["T1"]], market, window)["T1"], equal_nan=True)
+    print("rolling_beta matches pandas rolling cov/var")
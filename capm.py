@@ -0,0 +1,66 @@
+"""CAPM expected returns for many tickers, risk-free rates and horizons in one broadcasted calculation"""
+import numpy as np
+import plotly.graph_objs as go
+
+TRADING_DAYS = 252
+HORIZONS = ("Daily", "Quarterly", "Annual")
+
+
+def horizon_rates(risk_free_rates, market_returns, trading_days=TRADING_DAYS):
+    """Risk-free rate (R x 3) and market return (3,) per horizon, converted the same way as the dashboard.
+
+    Risk-free rates are annual and compounded down to daily/quarterly; the market return is
+    the arithmetic mean daily return scaled up by trading days.
+    """
+    rf = np.atleast_1d(np.asarray(risk_free_rates, dtype=float))
+    market_daily = float(np.nanmean(np.asarray(market_returns, dtype=float)))
+    rf_by_horizon = np.column_stack([
+        (1 + rf) ** (1 / trading_days) - 1,
+        (1 + rf) ** (1 / 4) - 1,
+        rf,
+    ])
+    market_by_horizon = np.array([
+        market_daily,
+        market_daily * (trading_days // 4),
+        market_daily * trading_days,
+    ])
+    return rf_by_horizon, market_by_horizon
+
+
+def capm_expected_returns(betas, market_returns, risk_free_rates, trading_days=TRADING_DAYS):
+    """E(Ri) = Rf + βi (E(Rm) - Rf) as an N x R x 3 array (tickers x risk-free rates x HORIZONS)."""
+    betas = np.atleast_1d(np.asarray(betas, dtype=float))
+    rf_by_horizon, market_by_horizon = horizon_rates(risk_free_rates, market_returns, trading_days)
+    return rf_by_horizon[None, :, :] + betas[:, None, None] * (market_by_horizon - rf_by_horizon)[None, :, :]
+
+
+def security_market_line_chart(names, betas, realised_returns, market_returns, risk_free_rates,
+                               trading_days=TRADING_DAYS):
+    """Plotly chart of the annual security market line for each risk-free rate, with every ticker
+    plotted at its beta and realised annual return."""
+    betas = np.asarray(betas, dtype=float)
+    rf_by_horizon, market_by_horizon = horizon_rates(risk_free_rates, market_returns, trading_days)
+    market_annual = market_by_horizon[2]
+    beta_range = np.linspace(min(0.0, np.nanmin(betas)), max(2.0, np.nanmax(betas)) * 1.05, 50)
+
+    fig = go.Figure()
+    for rf in rf_by_horizon[:, 2]:
+        fig.add_trace(go.Scatter(
+            x=beta_range, y=rf + beta_range * (market_annual - rf),
+            mode="lines", name=f"SML (Rf = {rf:.2%})",
+            line=dict(dash="dot", width=1)
+        ))
+    fig.add_trace(go.Scatter(
+        x=betas, y=realised_returns, mode="markers+text", text=list(names),
+        textposition="top center", name="Realised Annual Return",
+        marker=dict(color="orange", size=9)
+    ))
+    fig.update_layout(
+        title="Security Market Line",
+        xaxis_title="Beta (unitless)",
+        yaxis_title="Annual Return",
+        yaxis=dict(tickformat=".0%"),
+        template="plotly_white",
+        height=450,
+    )
+    return fig
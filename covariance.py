@@ -0,0 +1,139 @@
+"""Covariance models for the portfolio optimiser
+
+SingleIndexCovariance is the market-model covariance Σ = σ²ₘ ββᵀ + diag(residual variance),
+built from the same betas against ^GSPC that the dashboard shows. It is stored as three
+N-vectors rather than an N x N matrix and supports `cov @ weights` / `weights @ cov` in O(N),
+so standard_deviation() and the optimiser work on it unchanged.
+
+ledoit_wolf_cov() and constant_correlation_cov() are closed-form shrinkage estimators (Ledoit
+and Wolf 2004, 2003) and drop-in replacements for log_returns.cov(): same daily units and
+DataFrame layout, with the chosen shrinkage intensity in .attrs["shrinkage"]. Shrinking the
+noisy sample covariance towards a structured target keeps it well conditioned when there are
+many holdings relative to the number of days.
+"""
+import numpy as np
+import pandas as pd
+
+from beta_engine import batch_beta
+
+TRADING_DAYS = 252
+
+
+class SingleIndexCovariance:
+    """Low-rank plus diagonal covariance of the single-index model (annualised)."""
+
+    # make `ndarray @ cov` hand over to __rmatmul__ instead of converting cov to an array
+    __array_ufunc__ = None
+
+    def __init__(self, betas, market_variance, residual_variance, tickers=None):
+        self.betas = np.ascontiguousarray(betas, dtype=float)
+        self.market_variance = float(market_variance)
+        self.residual_variance = np.ascontiguousarray(residual_variance, dtype=float)
+        self.tickers = list(tickers) if tickers is not None else list(range(len(self.betas)))
+
+    @classmethod
+    def from_returns(cls, returns, market, trading_days=TRADING_DAYS):
+        """Fit from aligned daily returns (T x N) and market returns, e.g. panel.log_returns(holdings + ["^GSPC"]).
+
+        Betas come from batch_beta(); each asset's residual variance is the part of its sample
+        variance the market doesn't explain, (1 - R²) x Var(Ri), so the diagonal of Σ equals
+        the sample variances.
+        """
+        fit = batch_beta(returns, market)
+        m = np.asarray(market, dtype=float).reshape(-1)
+        R = np.asarray(returns, dtype=float)
+        asset_variance = np.nanvar(R.reshape(len(m), -1), axis=0, ddof=1)
+        residual = (1 - fit["R2"].to_numpy()) * asset_variance
+        return cls(fit["Beta"].to_numpy(), np.nanvar(m, ddof=1) * trading_days,
+                   np.clip(residual, 0.0, None) * trading_days, fit.index)
+
+    @property
+    def shape(self):
+        return (len(self.betas), len(self.betas))
+
+    def __len__(self):
+        return len(self.betas)
+
+    def __matmul__(self, other):
+        """Σ @ x for a vector (N,) or a matrix of column vectors (N, K) without forming Σ."""
+        x = np.asarray(other, dtype=float)
+        if x.ndim == 1:
+            return self.market_variance * self.betas * (self.betas @ x) + self.residual_variance * x
+        return (self.market_variance * np.outer(self.betas, self.betas @ x)
+                + self.residual_variance[:, None] * x)
+
+    def __rmatmul__(self, other):
+        # Σ is symmetric: xᵀΣ = (Σx)ᵀ
+        x = np.asarray(other, dtype=float)
+        return self @ x if x.ndim == 1 else (self @ x.T).T
+
+    def diagonal(self):
+        return self.market_variance * self.betas ** 2 + self.residual_variance
+
+    def to_dense(self):
+        """The full N x N matrix as a DataFrame like log_returns.cov() (O(N²) memory)."""
+        dense = self.market_variance * np.outer(self.betas, self.betas) + np.diag(self.residual_variance)
+        return pd.DataFrame(dense, index=self.tickers, columns=self.tickers)
+
+    def __repr__(self):
+        return (f"SingleIndexCovariance({len(self)} assets, market variance {self.market_variance:.4f}, "
+                f"mean beta {np.mean(self.betas):.3f})")
+
+
+def _centred(returns):
+    """T x N matrix of demeaned returns (rows with a missing value dropped) and the column names."""
+    frame = returns if isinstance(returns, pd.DataFrame) else pd.DataFrame(np.asarray(returns, dtype=float))
+    frame = frame.dropna()
+    X = frame.to_numpy(dtype=float)
+    return X - X.mean(axis=0), frame.columns
+
+
+def _shrink(X, columns, target, shrinkage):
+    """shrinkage x target + (1 - shrinkage) x sample covariance (ddof=1, as DataFrame.cov()).
+
+    The intensities follow the papers' 1/T moments, so the target (built from those) is
+    rescaled by T / (T - 1) to sit on the same scale as the ddof=1 sample.
+    """
+    T = len(X)
+    sample = X.T @ X / (T - 1)
+    cov = pd.DataFrame(shrinkage * target * T / (T - 1) + (1 - shrinkage) * sample, index=columns, columns=columns)
+    cov.attrs["shrinkage"] = shrinkage
+    return cov
+
+
+def ledoit_wolf_cov(returns):
+    """Ledoit-Wolf shrinkage towards a scaled identity (average variance on the diagonal, zero elsewhere)."""
+    X, columns = _centred(returns)
+    T, N = X.shape
+    S = X.T @ X / T
+    mu = np.trace(S) / N
+    # squared Frobenius distances, normalised by N as in the paper
+    d2 = (np.sum(S * S) - 2 * mu * np.trace(S) + mu * mu * N) / N
+    # sum over days of ||x_t x_tᵀ - S||² without forming the T outer products
+    b2 = (np.sum(np.sum(X * X, axis=1) ** 2) / T - np.sum(S * S)) / (T * N)
+    shrinkage = 0.0 if d2 == 0 else float(min(b2, d2) / d2)
+    return _shrink(X, columns, mu * np.eye(N), shrinkage)
+
+
+def constant_correlation_cov(returns):
+    """Ledoit-Wolf shrinkage towards the constant-correlation matrix (own variances, average pairwise correlation)."""
+    X, columns = _centred(returns)
+    T, N = X.shape
+    S = X.T @ X / T
+    std = np.sqrt(np.diag(S))
+    corr = S / np.outer(std, std)
+    r_bar = (corr.sum() - N) / (N * (N - 1))
+    target = r_bar * np.outer(std, std)
+    np.fill_diagonal(target, np.diag(S))
+
+    # asymptotic variances of the sample entries (pi) and their covariance with the target (rho)
+    X2 = X * X
+    pi_matrix = X2.T @ X2 / T - S * S
+    theta = (X2 * X).T @ X / T - np.diag(S)[:, None] * S
+    ratio = std[None, :] / std[:, None]  # sqrt(s_jj / s_ii)
+    off_diagonal = ~np.eye(N, dtype=bool)
+    rho = np.trace(pi_matrix) + r_bar * np.sum((ratio * theta)[off_diagonal])
+    gamma = np.sum((target - S) ** 2)
+    kappa = (pi_matrix.sum() - rho) / gamma if gamma > 0 else 0.0
+    shrinkage = float(np.clip(kappa / T, 0.0, 1.0))
+    return _shrink(X, columns, target, shrinkage)
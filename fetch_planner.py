@@ -0,0 +1,35 @@
+"""Runs every data dependency of a dashboard rerun concurrently instead of one blocking call after another"""
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_CONCURRENCY = 8
+
+
+class FetchPlan:
+    """Collects named fetches up front, then runs them all at once on a thread pool.
+
+    Time to results is bounded by the slowest fetch rather than the sum of all of them.
+    """
+
+    def __init__(self, max_workers=DEFAULT_CONCURRENCY):
+        self.max_workers = max_workers
+        self.tasks = {}
+        self.errors = {}
+
+    def add(self, name, func, *args, **kwargs):
+        self.tasks[name] = (func, args, kwargs)
+
+    def run(self):
+        """Run every fetch and return {name: result}. Failed fetches give None and their exception goes in self.errors."""
+        results = {}
+        if not self.tasks:
+            return results
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(self.tasks)))) as pool:
+            futures = {name: pool.submit(func, *args, **kwargs)
+                       for name, (func, args, kwargs) in self.tasks.items()}
+            for name, future in futures.items():
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    results[name] = None
+                    self.errors[name] = e
+        return results
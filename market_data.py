@@ -0,0 +1,305 @@
+"""Market data providers - every download and .info lookup in the project goes through get_provider()
+
+YFinanceProvider talks to Yahoo Finance. ReplayProvider serves CSV/Parquet fixtures and
+recorded responses from a folder so the dashboard can run and be benchmarked offline.
+Set MARKET_DATA_PROVIDER=replay and MARKET_DATA_DIR=<folder> to use it, or call set_provider().
+"""
+import atexit
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def period_start(period, end=None):
+    """Turn a yfinance style period ("5y", "6mo", "30d") into a start date."""
+    end = end or datetime.today()
+    if period.endswith("mo"):
+        return end - timedelta(days=int(period[:-2]) * 30)
+    if period.endswith("y"):
+        return end - timedelta(days=int(period[:-1]) * 365)
+    if period.endswith("d"):
+        return end - timedelta(days=int(period[:-1]))
+    raise ValueError(f"Unsupported period '{period}'")
+
+
+def clean_frame(frame):
+    """Flat price columns on a tz-naive Date index, with empty rows removed."""
+    frame = frame.dropna(how="all")
+    frame.columns.name = None
+    frame.index = pd.to_datetime(frame.index).tz_localize(None)
+    frame.index.name = "Date"
+    return frame
+
+
+def scratch_store_dir(kind):
+    """A fresh price store folder for this process, deleted on exit."""
+    directory = tempfile.mkdtemp(prefix=f"price_store_{kind}_")
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    return directory
+
+
+class YFinanceProvider:
+    """Daily bars and company info from Yahoo Finance."""
+
+    def download(self, tickers, start=None, end=None, period=None):
+        """Return {ticker: DataFrame of daily bars} for all tickers from one batched request (end exclusive)."""
+        import yfinance as yf
+
+        tickers = list(tickers)
+        if period is not None:
+            dates = dict(period=period)
+        else:
+            dates = dict(start=start.strftime(DATE_FORMAT), end=end.strftime(DATE_FORMAT))
+        data = yf.download(tickers, auto_adjust=False, progress=False, group_by="column", **dates)
+        frames = {}
+        for ticker in tickers:
+            if data is None or data.empty:
+                frames[ticker] = pd.DataFrame()
+            elif not isinstance(data.columns, pd.MultiIndex):
+                frames[ticker] = clean_frame(data.copy())
+            elif ticker not in data.columns.get_level_values(1):
+                frames[ticker] = pd.DataFrame()
+            else:
+                frames[ticker] = clean_frame(data.xs(ticker, axis=1, level=1))
+        return frames
+
+    def info(self, ticker):
+        import yfinance as yf
+
+        return yf.Ticker(ticker).info or {}
+
+
+class ReplayProvider:
+    """Serves daily bars from <directory>/<ticker>.parquet (or .csv) and company info from <directory>/info.json.
+
+    Periods are measured back from the last bar in each fixture, and start/end requests
+    (which the price store measures back from today) see each fixture moved forward by whole
+    weeks so its last bar falls in the week before today. Old recordings therefore still
+    return a full window. The price store uses a scratch folder (see store_dir) so fixture
+    data never mixes with the real store.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._store_dir = None
+
+    @property
+    def store_dir(self):
+        if self._store_dir is None:
+            self._store_dir = scratch_store_dir("replay")
+        return self._store_dir
+
+    def path(self, ticker, extension):
+        return os.path.join(self.directory, ticker.replace("^", "_IDX_") + extension)
+
+    def read(self, ticker):
+        parquet_path = self.path(ticker, ".parquet")
+        csv_path = self.path(ticker, ".csv")
+        if os.path.exists(parquet_path):
+            frame = pd.read_parquet(parquet_path)
+        elif os.path.exists(csv_path):
+            frame = pd.read_csv(csv_path, index_col=0, parse_dates=True)
+        else:
+            return pd.DataFrame()
+        return clean_frame(frame).sort_index()
+
+    def brought_forward(self, frame):
+        """frame with its dates moved on by whole weeks (weekdays kept) to end in the week before today."""
+        weeks = (pd.Timestamp.today().normalize() - frame.index[-1]).days // 7
+        if weeks > 0:
+            frame = frame.copy()
+            frame.index = frame.index + pd.Timedelta(weeks=weeks)
+        return frame
+
+    def download(self, tickers, start=None, end=None, period=None):
+        frames = {}
+        for ticker in tickers:
+            frame = self.read(ticker)
+            if not frame.empty:
+                if period is not None:
+                    last = frame.index[-1].to_pydatetime()
+                    frame = frame[frame.index > period_start(period, last)]
+                else:
+                    frame = self.brought_forward(frame)
+                    frame = frame[(frame.index >= start) & (frame.index < end)]
+            frames[ticker] = frame
+        return frames
+
+    def info(self, ticker):
+        info_path = os.path.join(self.directory, "info.json")
+        if not os.path.exists(info_path):
+            return {}
+        with open(info_path) as f:
+            return json.load(f).get(ticker, {})
+
+
+class RecordingProvider:
+    """Wraps another provider and saves every response in ReplayProvider's layout, to build offline fixtures.
+
+    The price store starts empty in a scratch folder, so every span the app asks for is
+    downloaded (and recorded) in full rather than as a delta on top of the real store.
+    """
+
+    def __init__(self, inner, directory):
+        self.inner = inner
+        self.replay = ReplayProvider(directory)
+        self._lock = threading.Lock()
+        self._store_dir = None
+
+    @property
+    def store_dir(self):
+        if self._store_dir is None:
+            self._store_dir = scratch_store_dir("record")
+        return self._store_dir
+
+    def download(self, tickers, start=None, end=None, period=None):
+        frames = self.inner.download(tickers, start=start, end=end, period=period)
+        os.makedirs(self.replay.directory, exist_ok=True)
+        with self._lock:
+            for ticker, frame in frames.items():
+                if frame.empty:
+                    continue
+                recorded = pd.concat([self.replay.read(ticker), frame])
+                recorded = recorded[~recorded.index.duplicated(keep="last")].sort_index()
+                recorded.to_parquet(self.replay.path(ticker, ".parquet"))
+        return frames
+
+    def info(self, ticker):
+        info = self.inner.info(ticker)
+        os.makedirs(self.replay.directory, exist_ok=True)
+        info_path = os.path.join(self.replay.directory, "info.json")
+        with self._lock:
+            recorded = {}
+            if os.path.exists(info_path):
+                with open(info_path) as f:
+                    recorded = json.load(f)
+            recorded[ticker] = {key: value for key, value in info.items()
+                                if isinstance(value, (str, int, float, bool)) or value is None}
+            with open(info_path, "w") as f:
+                json.dump(recorded, f, indent=2, sort_keys=True)
+        return info
+
+
+class _Flight:
+    """One in-flight upstream request that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class CoalescingProvider:
+    """Process-wide single-flight layer - identical requests already in flight are shared, not repeated.
+
+    Every Streamlit session runs in the same process, so when many sessions ask for
+    ^GSPC at once only one of them downloads it and the result is fanned out to the rest.
+    Batched downloads are coalesced per ticker, so upstream volume scales with distinct tickers.
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+        self._inflight = {}  # key -> _Flight
+        self._lock = threading.Lock()
+
+    @property
+    def store_dir(self):
+        return getattr(self.inner, "store_dir", None)
+
+    def _join_or_lead(self, keys):
+        """Split keys into flights already running (to wait on) and a new flight this caller leads."""
+        flight = _Flight()
+        with self._lock:
+            waiting = {key: self._inflight[key] for key in keys if key in self._inflight}
+            leading = [key for key in keys if key not in waiting]
+            for key in leading:
+                self._inflight[key] = flight
+        return waiting, leading, flight
+
+    def _finish(self, leading, flight):
+        with self._lock:
+            for key in leading:
+                self._inflight.pop(key, None)
+        flight.done.set()
+
+    def download(self, tickers, start=None, end=None, period=None):
+        tickers = list(dict.fromkeys(tickers))
+        keys = [("download", ticker, start, end, period) for ticker in tickers]
+        waiting, leading, flight = self._join_or_lead(keys)
+
+        frames = {}
+        if leading:
+            try:
+                flight.result = self.inner.download([key[1] for key in leading], start=start, end=end, period=period)
+            except Exception as e:
+                flight.error = e
+            finally:
+                self._finish(leading, flight)
+            if flight.error is not None:
+                raise flight.error
+            frames.update(flight.result)
+
+        for key, other in waiting.items():
+            other.done.wait()
+            if other.error is not None:
+                raise other.error
+            frames[key[1]] = other.result.get(key[1], pd.DataFrame()).copy()
+        return {ticker: frames.get(ticker, pd.DataFrame()) for ticker in tickers}
+
+    def info(self, ticker):
+        key = ("info", ticker)
+        waiting, leading, flight = self._join_or_lead([key])
+        if leading:
+            try:
+                flight.result = self.inner.info(ticker)
+            except Exception as e:
+                flight.error = e
+            finally:
+                self._finish(leading, flight)
+        else:
+            flight = waiting[key]
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return dict(flight.result)
+
+
+_provider = None
+
+
+def default_provider():
+    """Provider picked by the MARKET_DATA_PROVIDER (yfinance/replay/record) and MARKET_DATA_DIR variables."""
+    kind = os.environ.get("MARKET_DATA_PROVIDER", "yfinance").lower()
+    directory = os.environ.get("MARKET_DATA_DIR", "fixtures")
+    if kind == "replay":
+        return ReplayProvider(directory)
+    if kind == "record":
+        return RecordingProvider(YFinanceProvider(), directory)
+    if kind == "yfinance":
+        return YFinanceProvider()
+    raise ValueError(f"Unknown MARKET_DATA_PROVIDER '{kind}'")
+
+
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = CoalescingProvider(default_provider())
+        return _provider
+
+
+def set_provider(provider, coalesce=True):
+    """Swap the data source for the whole app (e.g. a faster internal feed) without touching the analytics."""
+    global _provider
+    with _provider_lock:
+        _provider = CoalescingProvider(provider) if coalesce else provider
@@ -0,0 +1,80 @@
+"""Cache of company metadata (name and industry) so yf.Ticker(...).info is not scraped on every rerun"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+
+from market_data import get_provider
+from price_store import store_dir
+
+DEFAULT_TTL = 30 * 24 * 60 * 60  # seconds - company names and industries change on a scale of months
+NEGATIVE_TTL = 60 * 60  # seconds before a lookup that came back without a company name is retried (throttled or sparse .info)
+MAX_MEMORY_ENTRIES = 512
+METADATA_FIELDS = ["longName", "shortName", "industry"]
+
+_memory = OrderedDict()  # ticker -> (fetched_at, metadata), most recently used last
+_lock = threading.Lock()
+
+
+def _connect():
+    os.makedirs(store_dir(), exist_ok=True)
+    conn = sqlite3.connect(os.path.join(store_dir(), "metadata.sqlite"), timeout=10)
+    conn.execute("CREATE TABLE IF NOT EXISTS metadata "
+                 "(ticker TEXT PRIMARY KEY, fetched_at REAL NOT NULL, data TEXT NOT NULL)")
+    return conn
+
+
+def _remember(ticker, fetched_at, metadata):
+    with _lock:
+        _memory[ticker] = (fetched_at, metadata)
+        _memory.move_to_end(ticker)
+        while len(_memory) > MAX_MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+
+
+def _fresh(fetched_at, metadata, now, ttl, negative_ttl):
+    """True if a cached entry is still within its TTL - the short one if it has no company name."""
+    has_name = metadata.get("longName") or metadata.get("shortName")
+    return now - fetched_at < (ttl if has_name else negative_ttl)
+
+
+def fetch_metadata(ticker):
+    """Look up longName, shortName and industry from the market data provider (raises on failure)."""
+    info = get_provider().info(ticker)
+    return {field: info.get(field) for field in METADATA_FIELDS if info.get(field) is not None}
+
+
+def get_ticker_metadata(ticker, ttl=DEFAULT_TTL, negative_ttl=NEGATIVE_TTL):
+    """Return {"longName", "shortName", "industry"} for ticker from memory, then SQLite, then Yahoo Finance.
+
+    Entries older than ttl seconds are refetched, or older than negative_ttl seconds if they
+    have no longName or shortName. Returns None if the lookup fails.
+    """
+    now = time.time()
+    with _lock:
+        cached = _memory.get(ticker)
+        if cached is not None and _fresh(cached[0], cached[1], now, ttl, negative_ttl):
+            _memory.move_to_end(ticker)
+            return cached[1]
+
+    with closing(_connect()) as conn, conn:
+        row = conn.execute("SELECT fetched_at, data FROM metadata WHERE ticker = ?", (ticker,)).fetchone()
+    if row is not None:
+        metadata = json.loads(row[1])
+        if _fresh(row[0], metadata, now, ttl, negative_ttl):
+            _remember(ticker, row[0], metadata)
+            return metadata
+
+    try:
+        metadata = fetch_metadata(ticker)
+    except Exception:
+        return None  # don't cache failures, the next rerun will try again
+
+    with closing(_connect()) as conn, conn:
+        conn.execute("INSERT OR REPLACE INTO metadata (ticker, fetched_at, data) VALUES (?, ?, ?)",
+                     (ticker, now, json.dumps(metadata)))
+    _remember(ticker, now, metadata)
+    return metadata
@@ -0,0 +1,145 @@
+"""Monte Carlo VaR and Expected Shortfall for a portfolio of correlated assets
+
+Scenarios are drawn from a multivariate normal of daily log returns (mean vector and
+covariance, e.g. log_returns.mean() and log_returns.cov()) through a Cholesky factor.
+Paths are generated in chunks whose scratch buffers fit in max_chunk_bytes (shared between
+the workers when chunks are spread over a process pool), and VaR/ES only keep the worst
+tail of the returns, so memory is the chunk budget plus the tail however many paths are
+asked for. Every block of BLOCK_PATHS paths gets its own child seed, so a given seed gives
+the same answer whatever the budget and with or without workers.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+BLOCK_PATHS = 1024  # paths drawn from each child seed
+
+
+def cholesky_factor(cov):
+    """Lower-triangular L with L @ L.T = cov; falls back to a clipped eigen-decomposition if cov isn't positive definite."""
+    cov = np.asarray(cov, dtype=float)
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        # more assets than observations makes the sample covariance singular
+        eigenvalues, eigenvectors = np.linalg.eigh(cov)
+        return eigenvectors * np.sqrt(np.clip(eigenvalues, 0.0, None))
+
+
+def _fill_chunk(entropy, first_block, weights, drift, factor, scale, normals, scenarios, out):
+    """Write one chunk of portfolio returns into out, using normals and scenarios as scratch space."""
+    for i in range(0, len(normals), BLOCK_PATHS):
+        # the child SeedSequence(seed).spawn() would give block first_block + i // BLOCK_PATHS
+        seed = np.random.SeedSequence(entropy, spawn_key=(first_block + i // BLOCK_PATHS,))
+        np.random.default_rng(seed).standard_normal(out=normals[i:i + BLOCK_PATHS])
+    np.matmul(normals, factor.T, out=scenarios)
+    scenarios *= scale
+    scenarios += drift
+    np.expm1(scenarios, out=scenarios)
+    np.matmul(scenarios, weights, out=out)
+
+
+def _simulate_chunk(args):
+    """Portfolio returns for one chunk of paths (runs in a worker process when workers > 1)."""
+    entropy, first_block, n_paths, weights, drift, factor, scale = args
+    normals = np.empty((n_paths, len(weights)))
+    out = np.empty(n_paths)
+    _fill_chunk(entropy, first_block, weights, drift, factor, scale, normals, np.empty_like(normals), out)
+    return out
+
+
+def _portfolio_return_chunks(weights, mean, cov, n_paths, horizon_days, seed, workers, max_chunk_bytes):
+    """Yield simulated portfolio returns chunk by chunk, in path order.
+
+    Without workers the chunks are views of one reused buffer, so copy anything kept past
+    the next chunk. With workers at most `workers` chunks are in flight at a time.
+    """
+    weights = np.asarray(weights, dtype=float)
+    drift = np.asarray(mean, dtype=float) * horizon_days
+    factor = cholesky_factor(cov)
+    scale = np.sqrt(horizon_days)
+    workers = workers if workers and workers > 1 else 1
+
+    # per path each in-flight chunk holds a row of normals and a row of correlated returns,
+    # plus its result in the worker and in this process (a chunk is never smaller than one block)
+    row_bytes = 8 * (2 * len(weights) + 2)
+    blocks = max(1, int(max_chunk_bytes // (workers * row_bytes * BLOCK_PATHS)))
+    chunk = blocks * BLOCK_PATHS
+    entropy = np.random.SeedSequence(seed).entropy
+    starts = range(0, n_paths, chunk)
+    jobs = ((entropy, start // BLOCK_PATHS, min(chunk, n_paths - start), weights, drift, factor, scale)
+            for start in starts)
+
+    if workers == 1 or len(starts) == 1:
+        normals = np.empty((min(chunk, n_paths), len(weights)))
+        scenarios = np.empty_like(normals)
+        out = np.empty(len(normals))
+        for job in jobs:
+            size = job[2]
+            _fill_chunk(job[0], job[1], weights, drift, factor, scale, normals[:size], scenarios[:size], out[:size])
+            yield out[:size]
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque(pool.submit(_simulate_chunk, job) for job in islice(jobs, workers))
+        while pending:
+            part = pending.popleft().result()
+            pending.extend(pool.submit(_simulate_chunk, job) for job in islice(jobs, 1))
+            yield part
+
+
+def simulate_portfolio_returns(weights, mean, cov, n_paths=1_000_000, horizon_days=1, seed=None,
+                               workers=None, max_chunk_bytes=64 * 2 ** 20):
+    """Simulated portfolio simple returns over horizon_days, one per path (the result itself is n_paths long)."""
+    returns = np.empty(n_paths)
+    start = 0
+    for part in _portfolio_return_chunks(weights, mean, cov, n_paths, horizon_days, seed, workers, max_chunk_bytes):
+        returns[start:start + len(part)] = part
+        start += len(part)
+    return returns
+
+
+def monte_carlo_var_es(weights, mean, cov, n_paths=1_000_000, horizon_days=1, confidence_levels=(0.95, 0.99),
+                       seed=None, workers=None, max_chunk_bytes=64 * 2 ** 20):
+    """{"VaR 95%": ..., "ES 95%": ..., ...} as positive losses (fractions of portfolio value)."""
+    tail_sizes = {level: max(1, int(np.ceil((1 - level) * n_paths))) for level in confidence_levels}
+    keep = max(tail_sizes.values())
+
+    # running buffer of the worst `keep` returns; once it is full only returns below its
+    # largest value can enter, so each merge touches the chunk plus the tail
+    worst = np.empty(0)
+    for part in _portfolio_return_chunks(weights, mean, cov, n_paths, horizon_days, seed, workers, max_chunk_bytes):
+        if len(worst) == keep:
+            part = part[part < worst[keep - 1]]
+        worst = np.concatenate((worst, part))
+        if len(worst) >= keep:
+            worst.partition(keep - 1)
+            worst = worst[:keep]
+
+    # one in-place partition puts every k-th smallest return in its sorted position
+    worst.partition(sorted({k - 1 for k in tail_sizes.values()}))
+    results = {}
+    for level, k in tail_sizes.items():
+        results[f"VaR {level:.0%}"] = -worst[k - 1]
+        results[f"ES {level:.0%}"] = -worst[:k].mean()
+    return results
+
+if __name__ == "__main__":
+    # timing for a 100-asset book: python monte_carlo_var.py
+    import os
+    import time
+
+    rng = np.random.default_rng(0)
+    n_assets = 100
+    loadings = rng.normal(0.0, 0.01, (n_assets, 5))
+    cov = loadings @ loadings.T + np.diag(rng.uniform(0.0001, 0.0004, n_assets))
+    mean = rng.normal(0.0003, 0.0002, n_assets)
+    weights = np.full(n_assets, 1 / n_assets)
+
+    for workers in (None, os.cpu_count()):
+        start = time.perf_counter()
+        results = monte_carlo_var_es(weights, mean, cov, n_paths=1_000_000, seed=42, workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f"workers={workers}: {elapsed:.2f}s", {key: f"{value:.4%}" for key, value in results.items()})
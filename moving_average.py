@@ -0,0 +1,36 @@
+"""Prefix-sum cache that serves any moving-average length and "last N days" tail by slicing"""
+import numpy as np
+import pandas as pd
+
+
+class MovingAverageCache:
+    """Built once per dataset - each slider move is then a couple of array slices instead of a rolling().mean().
+
+    Gives the same numbers as taking frame.tail(show_days) and then .rolling(ma_window).mean(),
+    i.e. the first ma_window - 1 days of the shown tail have no average.
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+        values = frame.to_numpy(dtype=float)
+        self.prefix = np.zeros((len(values) + 1, values.shape[1]))
+        np.cumsum(values, axis=0, out=self.prefix[1:])
+
+    def moving_average(self, show_days, ma_window):
+        """Moving averages of every column for the last show_days rows (NaN until ma_window rows are shown)."""
+        T = len(self.frame)
+        start = max(T - show_days, 0)
+        averages = np.full((T - start, self.prefix.shape[1]), np.nan)
+        first = start + ma_window - 1  # first row whose window fits inside the shown tail
+        if ma_window > 0 and first < T:
+            ends = np.arange(first, T) + 1
+            averages[first - start:] = (self.prefix[ends] - self.prefix[ends - ma_window]) / ma_window
+        return pd.DataFrame(averages, index=self.frame.index[start:], columns=self.frame.columns)
+
+    def view(self, show_days, ma_window):
+        """The last show_days rows plus a "<column>_MA" column per series when ma_window > 0."""
+        tail = self.frame.iloc[-show_days:]
+        if ma_window <= 0:
+            return tail.copy()
+        averages = self.moving_average(show_days, ma_window).add_suffix("_MA")
+        return pd.concat([tail, averages], axis=1)
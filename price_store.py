@@ -0,0 +1,304 @@
+"""Local on-disk price store so reruns read Parquet files instead of re-downloading from the market data provider"""
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from market_data import DATE_FORMAT, get_provider, period_start
+
+# one Parquet file per ticker plus a manifest of the date range each file covers
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "price_store")
+
+_manifest_lock = threading.Lock()  # manifest updates can come from several fetch threads at once
+
+# relative change in a re-downloaded bar's Close / Adj Close that means the history was re-adjusted
+ADJUSTMENT_TOLERANCE = 1e-5
+
+
+def store_dir():
+    """Folder of the store for the current provider.
+
+    Yahoo Finance data lives in STORE_DIR. Providers with their own store_dir (replay and
+    record modes get a scratch folder) are kept apart, so fixture data never lands in the
+    real store and a warm store never stops record mode downloading a full span.
+    """
+    return getattr(get_provider(), "store_dir", None) or STORE_DIR
+
+
+def manifest_path():
+    return os.path.join(store_dir(), "manifest.json")
+
+
+def load_manifest():
+    """Return the manifest dict ({ticker: {"start", "end", "fetched_at"}})."""
+    path = manifest_path()
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(manifest):
+    os.makedirs(store_dir(), exist_ok=True)
+    path = manifest_path()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)  # atomic so a crash never leaves half a manifest
+
+
+def update_manifest(entries):
+    """Merge {ticker: entry} into the manifest on disk without losing other threads' updates."""
+    if not entries:
+        return
+    with _manifest_lock:
+        manifest = load_manifest()
+        manifest.update(entries)
+        save_manifest(manifest)
+
+
+def forget_prices(tickers):
+    """Drop tickers from the manifest and delete their files, so the next load downloads them afresh."""
+    if not tickers:
+        return
+    with _manifest_lock:
+        manifest = load_manifest()
+        for ticker in tickers:
+            manifest.pop(ticker, None)
+            if os.path.exists(ticker_path(ticker)):
+                os.remove(ticker_path(ticker))
+        save_manifest(manifest)
+
+
+def ticker_path(ticker):
+    # "^" is valid in a file name but keep index symbols easy to spot on disk
+    return os.path.join(store_dir(), ticker.replace("^", "_IDX_") + ".parquet")
+
+
+def read_stored_prices(ticker):
+    """Return everything stored for ticker, or an empty DataFrame."""
+    path = ticker_path(ticker)
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    return pd.read_parquet(path)
+
+
+def write_stored_prices(ticker, prices):
+    os.makedirs(store_dir(), exist_ok=True)
+    # write then rename so a session reading the file never sees half of another session's write
+    path = ticker_path(ticker)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    prices.to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def resume_date(stored):
+    """Where a delta download restarts: the second-to-last stored bar.
+
+    The last bar may have been stored mid-session, so the one before it is the newest bar
+    known to be complete - re-downloading it gives adjustments_changed() something to compare.
+    """
+    return stored.index[-2 if len(stored) > 1 else -1].to_pydatetime()
+
+
+def adjustments_changed(stored, new_parts):
+    """True if a re-downloaded bar no longer matches the stored one.
+
+    Yahoo back-adjusts the whole series after every split and dividend, so a changed Close or
+    Adj Close on a date already stored means the stored history is on the old basis and new
+    bars can't simply be appended to it.
+    """
+    if stored.empty:
+        return False
+    for part in new_parts:
+        overlap = stored.index.intersection(part.index)
+        if overlap.empty:
+            continue
+        date = overlap[0]  # earliest shared bar - never a partial intraday one
+        for column in ("Adj Close", "Close"):
+            if column not in stored.columns or column not in part.columns:
+                continue
+            old, new = stored.at[date, column], part[column].loc[date]
+            new = new.iloc[-1] if isinstance(new, pd.Series) else new
+            if pd.notna(old) and pd.notna(new) and abs(new / old - 1) > ADJUSTMENT_TOLERANCE:
+                return True
+    return False
+
+
+def missing_spans(entry, start, end):
+    """Return the (start, end) spans of the request that the manifest entry does not cover."""
+    if entry is None:
+        return [(start, end)]
+    covered_start = datetime.strptime(entry["start"], DATE_FORMAT)
+    covered_end = datetime.strptime(entry["end"], DATE_FORMAT)
+    spans = []
+    if start < covered_start:
+        spans.append((start, covered_start))
+    if end > covered_end:
+        spans.append((covered_end, end))
+    return spans
+
+
+def merge_prices(ticker, stored, new_parts, manifest, start, end):
+    """Append newly downloaded bars to the stored series and widen the manifest entry."""
+    new_parts = [part for part in new_parts if not part.empty]
+    stored = pd.concat([stored] + new_parts) if new_parts else stored
+    stored = stored[~stored.index.duplicated(keep="last")].sort_index()
+    if new_parts:
+        write_stored_prices(ticker, stored)
+
+    entry = manifest.get(ticker)
+    covered_start = min([start] + ([datetime.strptime(entry["start"], DATE_FORMAT)] if entry else []))
+    covered_end = max([end] + ([datetime.strptime(entry["end"], DATE_FORMAT)] if entry else []))
+    manifest[ticker] = {
+        "start": covered_start.strftime(DATE_FORMAT),
+        "end": covered_end.strftime(DATE_FORMAT),
+        "fetched_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    return stored
+
+
+def download_many(tickers, start, end):
+    """Download daily bars for several tickers in one request, returns {ticker: DataFrame}."""
+    return get_provider().download(list(tickers), start=start, end=end)
+
+
+def load_price_matrix(tickers, period="5y", start=None, end=None, field="Adj Close"):
+    """Return an aligned date x ticker price matrix, downloading every missing ticker in one batched request."""
+    end = pd.Timestamp(end or datetime.today() + timedelta(days=1)).normalize().to_pydatetime()
+    start = pd.Timestamp(start or period_start(period, end)).normalize().to_pydatetime()
+    tickers = list(dict.fromkeys(tickers))
+    manifest = load_manifest()
+
+    # work out where each ticker's download has to start, tickers already covered are skipped
+    stored_by_ticker = {}
+    by_start = {}
+    for ticker in tickers:
+        entry = manifest.get(ticker)
+        stored = read_stored_prices(ticker) if entry is not None else pd.DataFrame()
+        stored_by_ticker[ticker] = stored
+        spans = missing_spans(entry, start, end)
+        if not spans:
+            continue
+        if stored.empty or spans[0][0] < datetime.strptime(entry["start"], DATE_FORMAT):
+            fetch_start = start
+        else:
+            fetch_start = min(spans[0][0], resume_date(stored))
+        by_start.setdefault(fetch_start, []).append(ticker)
+
+    merged = []
+    readjusted = []
+    for fetch_start, group in by_start.items():
+        frames = download_many(group, fetch_start, end)
+        for ticker in group:
+            new_part = frames.get(ticker, pd.DataFrame())
+            if new_part.empty and stored_by_ticker[ticker].empty:
+                continue
+            if adjustments_changed(stored_by_ticker[ticker], [new_part]):
+                readjusted.append(ticker)
+                continue
+            stored_by_ticker[ticker] = merge_prices(ticker, stored_by_ticker[ticker], [new_part],
+                                                    manifest, fetch_start, end)
+            merged.append(ticker)
+
+    if readjusted:
+        # history re-adjusted for a split or dividend since it was stored: one batched full refetch
+        refetch_start = min([start] + [stored_by_ticker[t].index[0].to_pydatetime() for t in readjusted])
+        forget_prices(readjusted)
+        frames = download_many(readjusted, refetch_start, end)
+        for ticker in readjusted:
+            manifest.pop(ticker, None)
+            stored_by_ticker[ticker] = pd.DataFrame()
+            new_part = frames.get(ticker, pd.DataFrame())
+            if new_part.empty:
+                continue
+            stored_by_ticker[ticker] = merge_prices(ticker, pd.DataFrame(), [new_part], manifest, refetch_start, end)
+            merged.append(ticker)
+    update_manifest({ticker: manifest[ticker] for ticker in merged})
+
+    # build the matrix in a single allocation on the union of trading dates
+    columns = {}
+    for ticker in tickers:
+        stored = stored_by_ticker[ticker]
+        if stored.empty:
+            continue
+        if field not in stored.columns:
+            field_name = "Close"  # some instruments have no adjusted close
+        else:
+            field_name = field
+        series = stored[field_name]
+        columns[ticker] = series[(series.index >= start) & (series.index < end)]
+    if not columns:
+        return pd.DataFrame()
+    index = pd.DatetimeIndex(sorted(set().union(*(series.index for series in columns.values()))), name="Date")
+    matrix = np.full((len(index), len(columns)), np.nan)
+    for j, series in enumerate(columns.values()):
+        matrix[index.get_indexer(series.index), j] = series.to_numpy(dtype=float)
+    return pd.DataFrame(matrix, index=index, columns=list(columns))
+
+
+def sync_prices(tickers, period="5y", max_age=timedelta(hours=1), batch_size=200):
+    """Bring the store up to date by fetching only the bars after each ticker's last stored date.
+
+    Tickers that share a last stored date are downloaded together in batches of batch_size,
+    and tickers synced within max_age are skipped. Tickers not yet stored get the full period,
+    as do tickers whose history was re-adjusted for a split or dividend since it was stored.
+    """
+    end = (datetime.today() + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    manifest = load_manifest()
+    now = datetime.now()
+
+    # group tickers by the date their download has to start from
+    by_start = {}
+    for ticker in dict.fromkeys(tickers):
+        entry = manifest.get(ticker)
+        if entry is not None and now - datetime.fromisoformat(entry["fetched_at"]) < max_age:
+            continue
+        stored = read_stored_prices(ticker) if entry is not None else pd.DataFrame()
+        if stored.empty:
+            sync_start = period_start(period, end)
+        else:
+            sync_start = resume_date(stored)
+        by_start.setdefault(sync_start, []).append((ticker, stored))
+
+    updated = {}
+    readjusted = []
+    for sync_start, group in by_start.items():
+        for i in range(0, len(group), batch_size):
+            batch = group[i:i + batch_size]
+            frames = download_many([ticker for ticker, _ in batch], sync_start, end)
+            for ticker, stored in batch:
+                new_part = frames.get(ticker, pd.DataFrame())
+                if new_part.empty and stored.empty:
+                    continue  # unknown ticker
+                if adjustments_changed(stored, [new_part]):
+                    readjusted.append((ticker, stored))
+                    continue
+                merged = merge_prices(ticker, stored, [new_part], manifest, sync_start, end)
+                updated[ticker] = len(merged) - len(stored)
+
+    # a split or dividend re-adjusted these histories: replace them with full downloads
+    forget_prices([ticker for ticker, _ in readjusted])
+    for i in range(0, len(readjusted), batch_size):
+        batch = readjusted[i:i + batch_size]
+        refetch_start = min([period_start(period, end)] + [stored.index[0].to_pydatetime() for _, stored in batch])
+        frames = download_many([ticker for ticker, _ in batch], refetch_start, end)
+        for ticker, stored in batch:
+            manifest.pop(ticker, None)
+            new_part = frames.get(ticker, pd.DataFrame())
+            if new_part.empty:
+                continue
+            merged = merge_prices(ticker, pd.DataFrame(), [new_part], manifest, refetch_start, end)
+            updated[ticker] = len(merged) - len(stored)
+    update_manifest({ticker: manifest[ticker] for ticker in updated})
+    return updated  # {ticker: number of new bars}
+
+
+if __name__ == "__main__":
+    # nightly refresh: python price_store.py AAPL MSFT ^GSPC ...
+    import sys
+    for ticker, new_bars in sync_prices(sys.argv[1:]).items():
+        print(f"{ticker}: {new_bars} new bars")
@@ -1,8 +1,7 @@
-import yfinance as yf
-import pandas as pd
 from datetime import datetime, timedelta 
 import numpy as np
-from scipy.optimize import minimize
+from price_store import load_price_matrix
+from portfolio_optimiser import SharpeProblem
 
 tickers = ['SPY','BND','GLD','QQQ','VTI']
 end_date = datetime.today()
@@ -10,15 +9,8 @@ end_date = datetime.today()
 start_date = end_date - timedelta(days = 5*365)
 print(start_date)
 
-adj_close_df = pd.DataFrame()
-
-for ticker in tickers:
-    data = yf.download(ticker, start=start_date, end=end_date)
-    print(f"{ticker} columns:", data.columns)
-    if 'Adj Close' in data.columns:
-        adj_close_df[ticker] = data['Adj Close']
-    else:
-        adj_close_df[ticker] = data['Close']
+# all tickers in one batched request, aligned on a common date index
+adj_close_df = load_price_matrix(tickers, start=start_date, end=end_date)
 
 print(adj_close_df)  
 
@@ -41,16 +33,13 @@ def sharpe_ratio(weights, log_returns, cov_matrix, risk_free_rate):
 
 risk_free_rate = 0.02
 
-def neg_sharpe_ratio(weights, log_returns, cov_matrix, risk_free_rate):
-    return -sharpe_ratio(weights, log_returns, cov_matrix, risk_free_rate)
-
-constraints = {'type':'eq','fun': lambda weights: np.sum(weights) - 1}
 bounds = [(0, 0.5) for _ in range(len(tickers))]
 
-initial_weights = np.array([1/len(tickers)]*len(tickers))
-print(initial_weights)
-
-optimized_results = minimize(neg_sharpe_ratio, initial_weights, args=(log_returns, cov_matrix, risk_free_rate), method='SLSQP', constraints=constraints, bounds=bounds)
+# the 50% caps rule out the exact long-only solve, so take the best of several SLSQP runs
+# (equal weights plus random feasible starts); workers=N spreads them over a process pool
+optimiser = SharpeProblem(log_returns, cov_matrix, risk_free_rate)
+optimized_results = optimiser.solve_multistart(n_starts=8, bounds=bounds, seed=42)
+print(optimized_results.runs)
 
 optimal_weights = optimized_results.x
 
@@ -0,0 +1,55 @@
+"""Aligned returns for every ticker on the dashboard, built once per rerun and shared by all sections"""
+import numpy as np
+import pandas as pd
+
+from price_store import load_price_matrix
+
+
+class ReturnsPanel:
+    """Prices and daily returns for a set of tickers held as single float matrices on a common date index.
+
+    Missing observations (e.g. a holding that listed recently) are NaN, so each
+    ticker's returns match what pct_change().dropna() on its own download gives.
+    """
+
+    def __init__(self, prices):
+        self.prices = prices
+        self.index = prices.index
+        self.columns = list(prices.columns)
+        self._position = {ticker: j for j, ticker in enumerate(self.columns)}
+
+        price_values = prices.to_numpy(dtype=float)
+        filled = prices.ffill().to_numpy(dtype=float)
+        # simple and log returns in one pass each, computed against the previous observed price
+        self.values = np.full(price_values.shape, np.nan)
+        self.log_values = np.full(price_values.shape, np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = price_values[1:] / filled[:-1]
+        self.values[1:] = ratio - 1
+        self.log_values[1:] = np.log(ratio)
+
+    @classmethod
+    def from_store(cls, tickers, period="5y", start=None, end=None):
+        """Build the panel from one batched read of the local price store."""
+        tickers = [t for t in dict.fromkeys(tickers) if t]
+        return cls(load_price_matrix(tickers, period=period, start=start, end=end))
+
+    def __contains__(self, ticker):
+        return ticker in self._position
+
+    def returns(self, ticker):
+        """Daily returns for one ticker as a 1-D Series (same as pct_change().dropna().squeeze())."""
+        column = self.values[:, self._position[ticker]]
+        mask = ~np.isnan(column)
+        return pd.Series(column[mask], index=self.index[mask], name=ticker)
+
+    def aligned(self, tickers, log=False):
+        """Returns for several tickers on the dates where all of them have data."""
+        positions = [self._position[t] for t in tickers]
+        block = (self.log_values if log else self.values)[:, positions]
+        mask = ~np.isnan(block).any(axis=1)
+        return pd.DataFrame(block[mask], index=self.index[mask], columns=list(tickers))
+
+    def log_returns(self, tickers):
+        """Log returns on common dates, as used by the portfolio optimiser."""
+        return self.aligned(tickers, log=True)
@@ -0,0 +1,58 @@
+"""Risk-free rate service - US 10 year Treasury yield (^TNX) cached locally with a TTL"""
+import threading
+import time
+from datetime import timedelta
+
+import pandas as pd
+
+from price_store import read_stored_prices, sync_prices
+
+RF_TICKER = "^TNX"
+DEFAULT_TTL = 6 * 60 * 60  # seconds - refresh the yield a few times a day at most
+TRADING_DAYS = 252
+
+_history = None  # (loaded_at, Series of annual rates as decimals)
+_lock = threading.Lock()
+
+
+def to_decimal(values):
+    # ^TNX is always quoted in percent (4.25 = 4.25%, 0.62 = 0.62%)
+    return values / 100.0
+
+
+def get_rf_history(period="5y", ttl=DEFAULT_TTL):
+    """Daily annual 10y yield as decimals (Series indexed by date), or an empty Series on failure."""
+    global _history
+    now = time.time()
+    with _lock:
+        if _history is not None and now - _history[0] < ttl:
+            return _history[1]
+
+        try:
+            sync_prices([RF_TICKER], period=period, max_age=timedelta(seconds=ttl))
+        except Exception:
+            pass  # fall back to whatever is already stored
+        stored = read_stored_prices(RF_TICKER)
+        if stored.empty:
+            return pd.Series(dtype=float, name=RF_TICKER)
+
+        history = to_decimal(stored["Adj Close"].dropna().astype(float)).rename(RF_TICKER)
+        _history = (now, history)
+        return history
+
+
+def latest_risk_free_rate(ttl=DEFAULT_TTL):
+    """Most recent annual 10y yield as a decimal, or None if unavailable."""
+    history = get_rf_history(ttl=ttl)
+    if history.empty:
+        return None
+    return float(history.iloc[-1])
+
+
+def daily_risk_free_rate(index, ttl=DEFAULT_TTL):
+    """Time-varying daily risk-free rate aligned to a date index (e.g. a returns series), for CAPM and Sharpe."""
+    history = get_rf_history(ttl=ttl)
+    if history.empty:
+        return pd.Series(float("nan"), index=index, name=RF_TICKER)
+    annual = history.reindex(history.index.union(index)).ffill().bfill().reindex(index)
+    return (1 + annual) ** (1 / TRADING_DAYS) - 1
@@ -0,0 +1,139 @@
+"""Risk metrics (mean, volatility, VaR, Expected Shortfall, Sharpe) for every column of a returns matrix at once"""
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+TRADING_DAYS = 252
+
+
+def _as_frame(returns):
+    if isinstance(returns, pd.Series):
+        return returns.to_frame()
+    if isinstance(returns, pd.DataFrame):
+        return returns
+    matrix = np.asarray(returns, dtype=float)
+    return pd.DataFrame(matrix if matrix.ndim == 2 else matrix[:, None])
+
+
+def risk_metrics(returns, risk_free_rate=0.0, confidence_levels=(0.95, 0.99), horizons=(1, TRADING_DAYS),
+                 trading_days=TRADING_DAYS):
+    """One row of metrics per ticker for a T x N matrix of daily returns (NaNs ignored per column).
+
+    Uses the same conventions as the competitor section: sample (ddof=1) standard deviation,
+    parametric VaR = z x std - mean scaled by sqrt(horizon days), and Sharpe from the daily
+    excess return (risk_free_rate / trading_days) annualised by sqrt(trading_days).
+    """
+    frame = _as_frame(returns)
+    R = frame.to_numpy(dtype=float)
+    n = np.sum(~np.isnan(R), axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.nanmean(R, axis=0)
+        std = np.sqrt(np.nansum((R - mean) ** 2, axis=0) / (n - 1))
+        metrics = {
+            "Mean Daily Return": mean,
+            "Daily Std Dev": std,
+            "Annual Std Dev": std * np.sqrt(trading_days),
+        }
+        for level in confidence_levels:
+            daily_var = norm.ppf(level) * std - mean
+            for days in horizons:
+                metrics[f"VaR {level:.0%} {days}d"] = daily_var * np.sqrt(days)
+        sharpe_daily = (mean - risk_free_rate / trading_days) / std
+        metrics["Sharpe Ratio"] = sharpe_daily * np.sqrt(trading_days)
+
+    return pd.DataFrame(metrics, index=frame.columns)
+
+
+def _tail_count(confidence, n):
+    """Number of worst observations in the (1 - confidence) tail, at least one."""
+    return np.maximum(1, np.ceil(np.round((1 - confidence) * n, 9))).astype(int)
+
+
+def historical_var_es(returns, confidence_levels=(0.95, 0.99)):
+    """Historical VaR and Expected Shortfall per column, as positive daily losses.
+
+    VaR is the k-th worst return with k = ceil((1 - confidence) x n) and ES the average of the
+    k worst. Uses np.partition (linear time selection) rather than sorting each column.
+    """
+    frame = _as_frame(returns)
+    R = frame.to_numpy(dtype=float)
+    n = np.sum(~np.isnan(R), axis=0)
+    # NaNs go to the top so they never land in the loss tail
+    R = np.where(np.isnan(R), np.inf, R)
+
+    metrics = {}
+    for level in confidence_levels:
+        k = _tail_count(level, n)
+        var = np.full(R.shape[1], np.nan)
+        es = np.full(R.shape[1], np.nan)
+        # columns with the same number of observations share one partition call
+        for kk in np.unique(k[n > 0]):
+            cols = np.flatnonzero((k == kk) & (n > 0))
+            tail = np.partition(R[:, cols], kk - 1, axis=0)[:kk]
+            var[cols] = -tail.max(axis=0)
+            es[cols] = -tail.mean(axis=0)
+        metrics[f"Historical VaR {level:.0%}"] = var
+        metrics[f"Expected Shortfall {level:.0%}"] = es
+    return pd.DataFrame(metrics, index=frame.columns)
+
+
+def _rolling_tail(x, window, k, threshold):
+    """The k smallest values of every trailing window of x, shape (len(x) - window + 1, k).
+
+    Only values at or below threshold (the column's lower tail) are carried from window to
+    window, so most windows select from a few dozen candidates instead of all window values.
+    Windows with fewer than k candidates (calm spells) fall back to a full selection.
+    """
+    ends = np.arange(window, len(x) + 1)  # window covers x[end - window:end]
+    tails = np.empty((len(ends), k))
+
+    is_candidate = x <= threshold
+    candidates = x[is_candidate]
+    seen = np.concatenate([[0], np.cumsum(is_candidate)])
+    lo = seen[ends - window]
+    count = seen[ends] - lo
+
+    enough = count >= k
+    if enough.any():
+        width = count[enough].max()
+        offsets = np.arange(width)
+        idx = np.minimum(lo[enough][:, None] + offsets, len(candidates) - 1)
+        block = np.where(offsets < count[enough][:, None], candidates[idx], np.inf)
+        tails[enough] = np.partition(block, k - 1, axis=1)[:, :k]
+    if not enough.all():
+        windows = np.lib.stride_tricks.sliding_window_view(x, window)[~enough]
+        tails[~enough] = np.partition(windows, k - 1, axis=1)[:, :k]
+    return tails
+
+
+def rolling_var_es(returns, window=250, confidence=0.95):
+    """Rolling historical VaR and Expected Shortfall (positive daily losses) for every column.
+
+    Same definitions as historical_var_es() applied to each trailing window; windows with any
+    missing value are NaN. Returns (var, es) DataFrames shaped like returns.
+    """
+    frame = _as_frame(returns)
+    R = frame.to_numpy(dtype=float)
+    T, N = R.shape
+    var = np.full((T, N), np.nan)
+    es = np.full((T, N), np.nan)
+    if T >= window:
+        k = int(_tail_count(confidence, window))
+        # candidates: roughly twice the tail each window needs
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns
+            thresholds = np.nanquantile(R, min(1.0, 2 * k / window), axis=0)
+        for j in range(N):
+            tails = _rolling_tail(R[:, j], window, k, thresholds[j])
+            var[window - 1:, j] = -tails.max(axis=1)
+            es[window - 1:, j] = -tails.mean(axis=1)
+
+        gaps = np.concatenate([np.zeros((1, N)), np.isnan(R).cumsum(axis=0)])
+        has_gap = (gaps[window:] - gaps[:-window]) > 0
+        var[window - 1:][has_gap] = np.nan
+        es[window - 1:][has_gap] = np.nan
+    return (pd.DataFrame(var, index=frame.index, columns=frame.columns),
+            pd.DataFrame(es, index=frame.index, columns=frame.columns))
@@ -0,0 +1,236 @@
+"""Incremental statistics that advance by one daily bar at a time instead of recomputing the whole history
+
+Each accumulator tracks N series at once (e.g. a ticker and the S&P 500), costs O(1) per
+series per bar, and can be checkpointed with to_dict() / from_dict() (plain JSON-able values).
+Bars are expected to be aligned and complete (no NaNs), like panel.aligned() returns.
+"""
+import numpy as np
+
+
+def _row(values, n=None):
+    row = np.atleast_1d(np.asarray(values, dtype=float))
+    if n is not None and row.shape != (n,):
+        raise ValueError(f"expected {n} values per bar, got {row.shape}")
+    return row
+
+
+class CumulativeReturn:
+    """Running (1 + r1)(1 + r2)... - 1, the dashboard's cumulative returns."""
+
+    def __init__(self, n_series=1):
+        self.growth = np.ones(n_series)
+        self.count = 0
+
+    def update(self, returns):
+        self.growth *= 1 + _row(returns, len(self.growth))
+        self.count += 1
+        return self.value
+
+    @property
+    def value(self):
+        return self.growth - 1
+
+    @classmethod
+    def from_history(cls, returns):
+        history = np.asarray(returns, dtype=float).reshape(len(returns), -1)
+        acc = cls(history.shape[1])
+        acc.growth = np.prod(1 + history, axis=0)
+        acc.count = len(history)
+        return acc
+
+    def to_dict(self):
+        return {"growth": self.growth.tolist(), "count": self.count}
+
+    @classmethod
+    def from_dict(cls, state):
+        acc = cls(len(state["growth"]))
+        acc.growth = np.asarray(state["growth"], dtype=float)
+        acc.count = state["count"]
+        return acc
+
+
+class RollingWindow:
+    """Fixed-length ring buffer of the last `window` bars, shared by the rolling accumulators."""
+
+    def __init__(self, window, n_series):
+        self.window = window
+        self.buffer = np.zeros((window, n_series))
+        self.pos = 0  # slot the next bar goes into
+        self.count = 0
+
+    def push(self, row):
+        """Store row and return the bar that dropped out of the window (None while filling)."""
+        dropped = self.buffer[self.pos].copy() if self.count >= self.window else None
+        self.buffer[self.pos] = row
+        self.pos = (self.pos + 1) % self.window
+        self.count += 1
+        return dropped
+
+    @property
+    def full(self):
+        return self.count >= self.window
+
+    def values(self):
+        """Bars currently in the window, oldest first."""
+        if not self.full:
+            return self.buffer[:self.count]
+        return np.roll(self.buffer, -self.pos, axis=0)
+
+    def to_dict(self):
+        return {"window": self.window, "buffer": self.buffer.tolist(), "pos": self.pos, "count": self.count}
+
+    @classmethod
+    def from_dict(cls, state):
+        ring = cls(state["window"], len(state["buffer"][0]))
+        ring.buffer = np.asarray(state["buffer"], dtype=float)
+        ring.pos = state["pos"]
+        ring.count = state["count"]
+        return ring
+
+
+class RollingMean:
+    """Moving average over the last `window` bars, same as series.rolling(window).mean()."""
+
+    def __init__(self, window, n_series=1):
+        self.ring = RollingWindow(window, n_series)
+        self.total = np.zeros(n_series)
+
+    def update(self, values):
+        row = _row(values, self.ring.buffer.shape[1])
+        dropped = self.ring.push(row)
+        self.total += row if dropped is None else row - dropped
+        if self.ring.count % self.ring.window == 0:
+            self.total = self.ring.values().sum(axis=0)  # re-sum once per window so rounding can't drift
+        return self.value
+
+    @property
+    def value(self):
+        if not self.ring.full:
+            return np.full(self.total.shape, np.nan)
+        return self.total / self.ring.window
+
+    @classmethod
+    def from_history(cls, values, window):
+        history = np.asarray(values, dtype=float).reshape(len(values), -1)
+        acc = cls(window, history.shape[1])
+        for row in history[-window:]:
+            acc.update(row)
+        return acc
+
+    def to_dict(self):
+        return {"ring": self.ring.to_dict(), "total": self.total.tolist()}
+
+    @classmethod
+    def from_dict(cls, state):
+        acc = cls(state["ring"]["window"], len(state["total"]))
+        acc.ring = RollingWindow.from_dict(state["ring"])
+        acc.total = np.asarray(state["total"], dtype=float)
+        return acc
+
+
+class RollingBeta:
+    """Rolling covariance with the market, market variance and beta over the last `window` bars.
+
+    Matches ri.rolling(window).cov(rm) / rm.rolling(window).var() for each of the N series.
+    """
+
+    def __init__(self, window, n_series=1):
+        self.window = window
+        self.n_series = n_series
+        # column 0 is the market, columns 1..N the series
+        self.ring = RollingWindow(window, n_series + 1)
+        self.sum_r = np.zeros(n_series)
+        self.sum_m = 0.0
+        self.sum_rm = np.zeros(n_series)
+        self.sum_mm = 0.0
+
+    def _resum(self):
+        """Recompute the running sums from the window so floating point error can't build up."""
+        window = self.ring.values()
+        m, r = window[:, 0], window[:, 1:]
+        self.sum_r = r.sum(axis=0)
+        self.sum_m = m.sum()
+        self.sum_rm = (r * m[:, None]).sum(axis=0)
+        self.sum_mm = (m * m).sum()
+
+    def update(self, returns, market_return):
+        r = _row(returns, self.n_series)
+        m = float(market_return)
+        dropped = self.ring.push(np.concatenate([[m], r]))
+        self.sum_r += r
+        self.sum_m += m
+        self.sum_rm += r * m
+        self.sum_mm += m * m
+        if dropped is not None:
+            old_m, old_r = dropped[0], dropped[1:]
+            self.sum_r -= old_r
+            self.sum_m -= old_m
+            self.sum_rm -= old_r * old_m
+            self.sum_mm -= old_m * old_m
+        if self.ring.count % self.window == 0:
+            self._resum()
+        return self.beta
+
+    @property
+    def cov(self):
+        if not self.ring.full:
+            return np.full(self.n_series, np.nan)
+        return (self.sum_rm - self.sum_r * self.sum_m / self.window) / (self.window - 1)
+
+    @property
+    def var(self):
+        if not self.ring.full:
+            return float("nan")
+        return (self.sum_mm - self.sum_m * self.sum_m / self.window) / (self.window - 1)
+
+    @property
+    def beta(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.cov / self.var
+
+    @classmethod
+    def from_history(cls, returns, market, window):
+        history = np.asarray(returns, dtype=float).reshape(len(returns), -1)
+        market = np.asarray(market, dtype=float).reshape(-1)
+        acc = cls(window, history.shape[1])
+        for r, m in zip(history[-window:], market[-window:]):
+            acc.update(r, m)
+        acc._resum()
+        return acc
+
+    def to_dict(self):
+        return {"window": self.window, "ring": self.ring.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state):
+        acc = cls(state["window"], len(state["ring"]["buffer"][0]) - 1)
+        acc.ring = RollingWindow.from_dict(state["ring"])
+        acc._resum()
+        return acc
+
+
+if __name__ == "__main__":
+    # check the accumulators against pandas over 5 years of bars: python streaming_stats.py
+    import json
+
+    import pandas as pd
+
+    rng = np.random.default_rng(7)
+    market = pd.Series(rng.normal(0.0004, 0.012, 1260))
+    stock = 1.3 * market + rng.normal(0.0, 0.015, len(market))
+
+    cum = CumulativeReturn.from_history(stock[:1000])
+    ma = RollingMean.from_history(stock[:1000], 30)
+    beta = RollingBeta.from_history(stock[:1000], market[:1000], 60)
+    for t in range(1000, len(market)):
+        if t == 1100:  # checkpoint and restore mid-stream
+            cum, ma, beta = (type(acc).from_dict(json.loads(json.dumps(acc.to_dict()))) for acc in (cum, ma, beta))
+        cum.update(stock[t])
+        ma.update(stock[t])
+        beta.update(stock[t], market[t])
+
+    assert np.isclose(cum.value[0], (1 + stock).prod() - 1)
+    assert np.isclose(ma.value[0], stock.rolling(30).mean().iloc[-1])
+    expected_beta = (stock.rolling(60).cov(market) / market.rolling(60).var()).iloc[-1]
+    assert np.isclose(beta.beta[0], expected_beta)
+    print("streaming accumulators match pandas")
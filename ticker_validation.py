@@ -0,0 +1,95 @@
+"""Ticker validation backed by a local symbol index, with caching of both valid and unknown symbols"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import pandas as pd
+
+from market_data import get_provider
+from price_store import load_manifest, store_dir
+
+NEGATIVE_TTL = 24 * 60 * 60  # seconds before an unknown symbol is checked again (it may have just listed)
+
+_known = {}  # ticker -> (valid, checked_at)
+_index_loaded = False
+_lock = threading.Lock()
+
+
+def _connect():
+    os.makedirs(store_dir(), exist_ok=True)
+    conn = sqlite3.connect(os.path.join(store_dir(), "symbols.sqlite"), timeout=10)
+    conn.execute("CREATE TABLE IF NOT EXISTS symbols "
+                 "(ticker TEXT PRIMARY KEY, valid INTEGER NOT NULL, checked_at REAL NOT NULL)")
+    return conn
+
+
+def _load_index():
+    """Fill the in-memory index from SQLite and the price store manifest (once per process)."""
+    global _index_loaded
+    with closing(_connect()) as conn:
+        rows = conn.execute("SELECT ticker, valid, checked_at FROM symbols").fetchall()
+    now = time.time()
+    with _lock:
+        for ticker, valid, checked_at in rows:
+            _known.setdefault(ticker, (bool(valid), checked_at))
+        # anything we already hold prices for is a valid symbol
+        for ticker in load_manifest():
+            _known[ticker] = (True, now)
+        _index_loaded = True
+
+
+def _cached(ticker, now, negative_ttl):
+    """Return True/False if the index can answer for ticker, otherwise None."""
+    entry = _known.get(ticker)
+    if entry is None:
+        return None
+    valid, checked_at = entry
+    if valid or now - checked_at < negative_ttl:
+        return valid
+    return None
+
+
+def probe_tickers(tickers):
+    """Ask the market data provider which of tickers exist using one batched 5-day download."""
+    frames = get_provider().download(list(tickers), period="5d")
+    return {ticker: not frames.get(ticker, pd.DataFrame()).empty for ticker in tickers}
+
+
+def validate_tickers(tickers, negative_ttl=NEGATIVE_TTL):
+    """Return {ticker: True/False}, only going to the network for symbols not seen before."""
+    if not _index_loaded:
+        _load_index()
+    now = time.time()
+    tickers = [t.strip().upper() for t in tickers if t and t.strip()]
+    results = {}
+    unknown = []
+    with _lock:
+        for ticker in dict.fromkeys(tickers):
+            valid = _cached(ticker, now, negative_ttl)
+            if valid is None:
+                unknown.append(ticker)
+            else:
+                results[ticker] = valid
+
+    if unknown:
+        try:
+            probed = probe_tickers(unknown)
+        except Exception:
+            probed = {}  # network failure - report as invalid but don't remember it
+        with closing(_connect()) as conn, conn:
+            for ticker in unknown:
+                valid = probed.get(ticker, False)
+                results[ticker] = valid
+                if ticker in probed:
+                    conn.execute("INSERT OR REPLACE INTO symbols (ticker, valid, checked_at) VALUES (?, ?, ?)",
+                                 (ticker, int(valid), now))
+                    with _lock:
+                        _known[ticker] = (valid, now)
+    return results
+
+
+def is_valid_ticker(ticker, negative_ttl=NEGATIVE_TTL):
+    """True if ticker is a known Yahoo Finance symbol."""
+    return validate_tickers([ticker], negative_ttl).get(ticker.strip().upper(), False)